@@ -1,37 +1,28 @@
-import pygame
-import sys
-import random
-import time
+import os
 import numpy as np
+from board_core import X, O, TIE, STATE_LEGAL_MASK, state_cells, MOVE_DELTAS
+from game_state import GameState
+from q_training import train_headless, select_moves
+from snapshots import save_q_table, load_q_table
+from symmetry import NUM_CANONICAL_STATES, TRANSFORM_ARRAY, canonical_row, to_canonical_action
+from q_storage import SparseQStore
+from profiling import profiler
+from game_log import GameLogWriter
+from rendering import BoardRenderer, MoveTimer, WIDTH, HEIGHT
 
-# Constants
-WIDTH, HEIGHT = 600, 600
-LINE_WIDTH = 15
-LINE_COLOR = (23, 145, 135)  # Black color for grid lines
-CIRCLE_COLOR = (242, 85, 96)
-X_COLOR = (0, 0, 255)  # Blue color for Player 1's 'X'
-BG_COLOR = (28, 170, 156)
-CIRCLE_RADIUS = 60
-CIRCLE_WIDTH = 15
-X_WIDTH = 25
-X_OFFSET = 50
-O_OFFSET = 60
-
-# Initialize Pygame
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Tic Tac Toe")
-font = pygame.font.Font(None, 40)
-
-# The game board
-board = [[" ", " ", " "],
-         [" ", " ", " "],
-         [" ", " ", " "]]
+AI_MOVE_DELAY = 1000  # Milliseconds between moves, so they are visible
+
+# Window, created by run(), so importing this file never opens one
+renderer = None
+
+# The game: board, side to move and move history (also what goes into the
+# game log)
+game = GameState()
 
 # Game variables
 player_1_symbol = "X"
 player_2_symbol = "O"
-current_player = player_1_symbol
+SYMBOLS = {X: player_1_symbol, O: player_2_symbol}
 game_over = False
 
 # Score counters
@@ -44,191 +35,142 @@ ALPHA = 0.1      # Learning rate
 GAMMA = 0.9      # Discount factor
 EPSILON = 0.2   # Exploration rate
 NUM_EPISODES = 10  # Number of games to train the AI
+HEADLESS_EPISODES = 200000  # Games trained without pygame before the visible episodes
+Q_TABLE_FILE = "q_table.bin"  # Learned table is saved here and reused on the next launch
+GAME_LOG_FILE = "games.log"  # Every visible game is appended here (see game_log.py)
+PRINT_MOVES = False  # Also print every move to stdout (slow)
+AI_SEED = None  # Seed of the move choices, for replayable games
+rng = np.random.default_rng(AI_SEED)
 
-# Define Q-table: flatten the board, so there are 3^9 possible states
-Q_table = {}
+# Define Q-table: flatten the board, so there are 3^9 possible states, but
+# boards that are rotations/reflections of each other share one row
+Q_table = np.zeros((NUM_CANONICAL_STATES, 9), dtype=np.float32)
 
 # Initialize Q-table
 def initialize_q_table():
-    for i in range(3**9):
-        Q_table[i] = [0] * 9  # 9 actions (corresponding to positions 0 to 8)
+    Q_table.fill(0)  # 9 actions (corresponding to positions 0 to 8)
+
+# The game reads and updates Q-values through a storage backend
+# (q_storage.py); only the rows of states actually seen are allocated
+Q_store = SparseQStore()
+trained_episodes = 0  # Episodes behind the loaded table
+
+# Symbol <-> cell value mapping used by the state numbers
+SYMBOL_VALUES = {' ': 0, 'X': 1, 'O': 2}
+VALUE_SYMBOLS = (' ', 'X', 'O')
 
 # Convert the board state to a unique number for Q-table lookup
 def state_to_number(state):
-    mapping = {' ': 0, 'X': 1, 'O': 2}
     num = 0
     for i, row in enumerate(state):
         for j, cell in enumerate(row):
-            num += mapping[cell] * (3 ** (i * 3 + j))
+            num += MOVE_DELTAS[SYMBOL_VALUES[cell]][i * 3 + j]
     return num
 
 # Convert a Q-table state number back to the board representation
 def number_to_state(num):
-    mapping = {0: ' ', 1: 'X', 2: 'O'}
-    state = [[' ' for _ in range(3)] for _ in range(3)]
-    for i in range(9):
-        state[i // 3][i % 3] = mapping[num % 3]
-        num //= 3
-    return state
-
-# Draw grid lines
-def draw_lines():
-    # Horizontal lines
-    pygame.draw.line(screen, LINE_COLOR, (0, HEIGHT // 3), (WIDTH, HEIGHT // 3), LINE_WIDTH)
-    pygame.draw.line(screen, LINE_COLOR, (0, 2 * HEIGHT // 3), (WIDTH, 2 * HEIGHT // 3), LINE_WIDTH)
-    
-    # Vertical lines
-    pygame.draw.line(screen, LINE_COLOR, (WIDTH // 3, 0), (WIDTH // 3, HEIGHT), LINE_WIDTH)
-    pygame.draw.line(screen, LINE_COLOR, (2 * WIDTH // 3, 0), (2 * WIDTH // 3, HEIGHT), LINE_WIDTH)
-
-# Draw X and O symbols
-def draw_symbols():
-    for row in range(3):
-        for col in range(3):
-            if board[row][col] == "X":
-                pygame.draw.line(screen, X_COLOR, 
-                                 (col * WIDTH // 3 + X_OFFSET, row * HEIGHT // 3 + X_OFFSET), 
-                                 ((col + 1) * WIDTH // 3 - X_OFFSET, (row + 1) * HEIGHT // 3 - X_OFFSET), X_WIDTH)
-                pygame.draw.line(screen, X_COLOR, 
-                                 ((col + 1) * WIDTH // 3 - X_OFFSET, row * HEIGHT // 3 + X_OFFSET), 
-                                 (col * WIDTH // 3 + X_OFFSET, (row + 1) * HEIGHT // 3 - X_OFFSET), X_WIDTH)
-            elif board[row][col] == "O":
-                pygame.draw.circle(screen, CIRCLE_COLOR, 
-                                   (col * WIDTH // 3 + WIDTH // 6, row * HEIGHT // 3 + HEIGHT // 6), 
-                                   CIRCLE_RADIUS, CIRCLE_WIDTH)
+    cells = state_cells(num)
+    return [[VALUE_SYMBOLS[cell] for cell in cells[i:i + 3]] for i in (0, 3, 6)]
+
+# Find the winner and the line they completed, without drawing anything
+def find_winner():
+    winner = game.winner()
+    return (SYMBOLS[winner], game.winning_line()) if winner else (None, -1)
 
 # Check for winner
 def check_winner():
-    global game_over, current_player
-    # Check rows, columns, and diagonals
-    for row in range(3):
-        if board[row][0] == board[row][1] == board[row][2] != " ":
-            pygame.draw.line(screen, (250, 0, 0), 
-                             (0, row * HEIGHT // 3 + HEIGHT // 6), 
-                             (WIDTH, row * HEIGHT // 3 + HEIGHT // 6), 10)
-            game_over = True
-            return board[row][0]
-
-    for col in range(3):
-        if board[0][col] == board[1][col] == board[2][col] != " ":
-            pygame.draw.line(screen, (250, 0, 0), 
-                             (col * WIDTH // 3 + WIDTH // 6, 0), 
-                             (col * WIDTH // 3 + WIDTH // 6, HEIGHT), 10)
-            game_over = True
-            return board[0][col]
-
-    if board[0][0] == board[1][1] == board[2][2] != " ":
-        pygame.draw.line(screen, (250, 0, 0), (0, 0), (WIDTH, HEIGHT), 10)
-        game_over = True
-        return board[0][0]
-
-    if board[0][2] == board[1][1] == board[2][0] != " ":
-        pygame.draw.line(screen, (250, 0, 0), (WIDTH, 0), (0, HEIGHT), 10)
+    global game_over
+    winner, line = find_winner()
+    if winner is not None:
+        if renderer is not None:
+            renderer.set_win_line(line)
         game_over = True
-        return board[0][2]
-
-    return None
+    return winner
 
 # Check for tie
 def check_tie():
-    for row in range(3):
-        for col in range(3):
-            if board[row][col] == " ":
-                return False
-    return True
+    return game.outcome() == TIE
 
 # Draw the game status
 def draw_status():
     if game_over:
-        message = f"Player {current_player} Wins!"
+        message = f"Player {find_winner()[0]} Wins!"
     elif check_tie():
         message = "It's a Tie!"
     else:
-        message = f"Player {current_player}'s Turn"
+        message = f"Player {SYMBOLS[game.side]}'s Turn"
 
-    text = font.render(message, True, (0, 0, 0))
-    screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT - 50))
+    renderer.set_status(message)
     
     # Display the total score at the top of the screen
-    score_text = font.render(f"Player 1: {player_1_wins}  Player 2: {player_2_wins}  Ties: {ties}", True, (0, 0, 0))
-    screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 10))
+    renderer.set_score(f"Player 1: {player_1_wins}  Player 2: {player_2_wins}  Ties: {ties}")
 
 # Handle click (for Player 1)
 def handle_click(x, y):
-    global current_player
     row = y // (HEIGHT // 3)
     col = x // (WIDTH // 3)
 
-    if board[row][col] == " " and not game_over:
-        board[row][col] = current_player
-        if check_winner() is None and not check_tie():
-            current_player = player_2_symbol  # Switch to Player 2's turn (AI)
+    if row * 3 + col in game.legal_moves() and not game_over:
+        game.push(row * 3 + col)  # Also passes the turn to Player 2 (AI)
+        check_winner()
 
 # AI Move: Player 2 (and Player 1)
 def ai_move():
-    global current_player
-
-    # Get all available moves (empty spots on the board)
-    available_moves = [(r, c) for r in range(3) for c in range(3) if board[r][c] == " "]
+    # Get all available moves (empty cells on the board)
+    available_moves = game.legal_moves()
     
     # If there are no available moves, the game is over (just return)
     if not available_moves:
         return
 
-    # Convert board to number representation (state number)
-    state_num = state_to_number(board)
+    # The state number is kept up to date by every move; find its row in
+    # the Q-table
+    with profiler.phase("encode"):
+        state_num = game.state
+        row, transform = canonical_row(state_num)
     
-    if random.random() < EPSILON:
-        # Exploration: Choose random move
-        move = random.choice(available_moves)
-    else:
-        # Exploitation: Choose the best move based on Q-table
-        # First, collect the Q-values for the available moves
-        q_values = [Q_table[state_num][r * 3 + c] for r, c in available_moves]
-        
-        # Ensure that q_values is not empty
-        if q_values:
-            max_q_value = max(q_values)  # Get the max Q-value
-            best_moves = [available_moves[i] for i in range(len(available_moves)) if q_values[i] == max_q_value]
-            move = random.choice(best_moves)  # Pick a random best move from the options
-        else:
-            # If no valid Q-values exist, choose a random move
-            move = random.choice(available_moves)
+    with profiler.phase("select"):
+        # Exploration (a random move) with probability EPSILON, otherwise
+        # exploitation: a random pick among the legal moves with the highest
+        # Q-value. The row's values are put in board order and the illegal
+        # cells masked out, all in NumPy (q_training.select_moves)
+        q_values = Q_store.row(row)[TRANSFORM_ARRAY[transform]]
+        move = int(select_moves(q_values[None], STATE_LEGAL_MASK[state_num][None], EPSILON, rng)[0])
     
-    # Perform the move
-    board[move[0]][move[1]] = current_player
+    # Perform the move (this also switches players; after a win the winner
+    # still starts the next game, see play_episodes())
+    mover = SYMBOLS[game.side]
+    game.push(move)
 
     # Check for terminal state (game over) and calculate reward
-    winner = check_winner()
+    with profiler.phase("win_check"):
+        winner = check_winner()
+        tie = winner is None and check_tie()
     reward = 0
     if winner == player_2_symbol:  # AI wins
         reward = 1
     elif winner == player_1_symbol:  # Player 1 wins
         reward = -1
-    elif check_tie():  # Tie
+    elif tie:  # Tie
         reward = 0
 
-    # Update the Q-table
-    new_state_num = state_to_number(board)
-    
-    if winner or check_tie():
-        # If the game ends, no future states, so use reward directly
-        Q_table[state_num][move[0] * 3 + move[1]] += ALPHA * (reward - Q_table[state_num][move[0] * 3 + move[1]])
-        draw_symbols()
-        draw_status()
-    else:
-        # If not game over, we update based on the next best state
-        future_q_value = max(Q_table[new_state_num]) if new_state_num in Q_table else 0
-        Q_table[state_num][move[0] * 3 + move[1]] += ALPHA * (reward + GAMMA * future_q_value - Q_table[state_num][move[0] * 3 + move[1]])
-        draw_symbols()
+    # Update the Q-table (the new state number only changes by this move)
+    with profiler.phase("q_update"):
+        new_state_num = game.state
+        action = to_canonical_action(move, transform)
         
-    pygame.display.update()
-    print(f"Player {current_player} chooses position {move} with reward {reward}")
-    
+        if winner or tie:
+            # If the game ends, no future states, so use reward directly
+            Q_store.update(row, action, reward, ALPHA)
+        else:
+            # If not game over, we update based on the next best state
+            future_q_value = Q_store.row(canonical_row(new_state_num)[0]).max()
+            Q_store.update(row, action, reward + GAMMA * future_q_value, ALPHA)
 
-    # Switch players after the move
-    if not game_over:
-        current_player = player_1_symbol if current_player == player_2_symbol else player_2_symbol
+    if PRINT_MOVES:
+        with profiler.phase("print"):
+            print(f"Player {mover} chooses position {divmod(move, 3)} with reward {reward}")
+    profiler.count("moves")
 
     # Update the win/tie counters
     if winner == player_1_symbol:
@@ -237,37 +179,89 @@ def ai_move():
     elif winner == player_2_symbol:
         global player_2_wins
         player_2_wins += 1
-    elif check_tie():
+    elif tie:
         global ties
         ties += 1
 
+# Draw one frame: only what changed since the last frame is repainted
+def draw_frame():
+    renderer.handle_events()
+    renderer.set_masks(game.x_mask, game.o_mask)
+    draw_status()
+    renderer.render()
+    renderer.tick()
+
 # Main game loop
 def main():
-    initialize_q_table() 
-    pygame.display.update()
-
-# Initialize Q-table and start training
-initialize_q_table()
-
-for episode in range(NUM_EPISODES):
-    board = [[" ", " ", " "], [" ", " ", " "], [" ", " ", " "]]
-    screen.fill(BG_COLOR)
-    draw_lines()
-
-    game_over = False
-
-    while not game_over:
-        time.sleep(1)
-        draw_symbols()
-        ai_move()
-
-        if check_winner() or check_tie():
-            draw_symbols()
-            game_over = True
-
-    if episode % 1 == 0:
-        print(f"Episode {episode+1}/{NUM_EPISODES}")
-
-# Run the game after training
-while True:
-    main()
\ No newline at end of file
+    draw_frame()
+
+# Load the saved Q-table (copy-on-write, so the file itself is never changed),
+# or train one headlessly and save it for the next launch. The game reads
+# rows by canonical state, so a table with one row per state number (e.g.
+# from snapshots.train_with_checkpoints(..., canonical=False)) is refused.
+def load_or_train():
+    global Q_table, Q_store, trained_episodes
+    if os.path.exists(Q_TABLE_FILE):
+        Q_table, header = load_q_table(Q_TABLE_FILE, mode="c")
+        if not header.get("canonical") or Q_table.shape != (NUM_CANONICAL_STATES, 9):
+            raise ValueError(f"{Q_TABLE_FILE} holds a {Q_table.shape[0]}-row table, but the game "
+                             f"needs a canonical one ({NUM_CANONICAL_STATES} rows); train one "
+                             f"with `python . train` or delete the file")
+        trained_episodes = header["episodes"]
+    else:
+        initialize_q_table()
+        train_headless(Q_table, num_episodes=HEADLESS_EPISODES, canonical=True)
+        trained_episodes = HEADLESS_EPISODES
+        save_q_table(Q_TABLE_FILE, Q_table, episodes=trained_episodes)
+    Q_store = SparseQStore.from_dense(Q_table)
+
+# Play the visible episodes, learning from every move, then save the table
+def play_episodes(num_episodes=NUM_EPISODES):
+    global game_over, move_timer
+    game_log = GameLogWriter(GAME_LOG_FILE)
+    move_timer = MoveTimer(AI_MOVE_DELAY)
+    for episode in range(num_episodes):
+        first_player = game.next_first()  # The winner keeps the first move
+        game.reset(first_player)
+        renderer.set_win_line(-1)
+
+        game_over = False
+
+        while not game_over:
+            if move_timer.ready():
+                ai_move()
+
+                if check_winner() or check_tie():
+                    game_over = True
+            draw_frame()
+
+        game_log.record(game.moves(), game.outcome(), "qtable", "qtable", first_player)
+        game_log.flush()  # The window can be closed at any time
+
+        if episode % 1 == 0:
+            print(f"Episode {episode+1}/{num_episodes}")
+
+        # Leave the final position on screen until the next move would be due
+        while not move_timer.ready():
+            draw_frame()
+    game_log.close()
+
+    # Keep what the visible episodes learned
+    save_q_table(Q_TABLE_FILE, Q_store.to_dense(NUM_CANONICAL_STATES),
+                 episodes=trained_episodes + num_episodes)
+    stats = Q_store.stats()
+    print(f"Q-table: {stats['rows']} of {NUM_CANONICAL_STATES} rows resident, "
+          f"{(stats['table_bytes'] + stats['index_bytes']) / 1024:.0f} KiB")
+
+# Open the window, load (or train) the table, play the visible episodes and
+# keep showing the last game until the window is closed
+def run(num_episodes=NUM_EPISODES):
+    global renderer
+    renderer = BoardRenderer("Tic Tac Toe")
+    load_or_train()
+    play_episodes(num_episodes)
+    while True:
+        main()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,4 @@
+from cli import main
+
+# `python .` (or `python path/to/AI_Project`) runs the command line in cli.py
+main()
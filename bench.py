@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import numpy as np
+from board_core import X, O, FULL_MASK, IS_WIN, legal_moves, masks_to_state
+from search import MinimaxSearch
+from mcts import MCTSSearch
+from symmetry import canonical_row, to_canonical_action
+from q_training import train_headless, greedy_actions
+from snapshots import load_q_table
+import solver
+
+Q_TABLE_FILE = "q_table.bin"
+
+# Every agent answers choose_move(x_mask, o_mask, side) with a cell 0-8 for
+# `side` (X or O) to play. The games themselves never touch pygame.
+
+# Random legal move, like ai_move() in TicTacToe.py
+class RandomAgent:
+    name = "random"
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose_move(self, x_mask, o_mask, side):
+        return self.rng.choice(legal_moves(x_mask, o_mask))
+
+# Perfect play from the alpha-beta transposition-table search (search.py)
+class MinimaxAgent:
+    name = "minimax"
+
+    def __init__(self):
+        self.engine = MinimaxSearch()
+
+    def choose_move(self, x_mask, o_mask, side):
+        return self.engine.best_move(x_mask, o_mask, side)
+
+# Lookup in the precomputed perfect-play table, like findBestMove() in mini.py
+class PerfectPlayAgent:
+    name = "perfect"
+
+    def choose_move(self, x_mask, o_mask, side):
+        return solver.best_move(masks_to_state(x_mask, o_mask), side)
+
+# Time-limited Monte Carlo tree search (mcts.py), like findBestMove() in
+# mini.py run with --mcts
+class MCTSAgent:
+    name = "mcts"
+
+    def __init__(self, time_budget=0.005, seed=None):
+        self.engine = MCTSSearch(time_budget=time_budget, seed=seed)
+
+    def choose_move(self, x_mask, o_mask, side):
+        return self.engine.best_move(x_mask, o_mask, side)
+
+# Greedy policy over a Q-table, like the exploitation branch of ai_move() in
+# Q_learninginRL.py (ties between the best moves are broken at random)
+class QTableAgent:
+    name = "qtable"
+
+    def __init__(self, q_table, seed=None):
+        self.q_table = q_table
+        self.canonical = q_table.shape[0] != 3 ** 9
+        self.rng = random.Random(seed)
+        self.batch_rng = np.random.default_rng(seed)
+
+    # One move at a time a plain Python scan is faster than a NumPy call
+    def choose_move(self, x_mask, o_mask, side):
+        state = masks_to_state(x_mask, o_mask)
+        moves = legal_moves(x_mask, o_mask)
+        if self.canonical:
+            row, transform = canonical_row(state)
+            values = [self.q_table[row, to_canonical_action(cell, transform)] for cell in moves]
+        else:
+            values = [self.q_table[state, cell] for cell in moves]
+        best = max(values)
+        return self.rng.choice([cell for cell, value in zip(moves, values) if value == best])
+
+    # Moves for a whole array of state numbers in one vectorized call
+    # (q_training.greedy_actions); -1 where the game is over
+    def choose_moves(self, states):
+        return greedy_actions(self.q_table, states, rng=self.batch_rng, canonical=self.canonical)
+
+# The saved Q-table if there is one, otherwise a freshly trained one
+def load_or_train_q_table(path=Q_TABLE_FILE, episodes=200000):
+    if path and os.path.exists(path):
+        return load_q_table(path)[0]
+    return train_headless(num_episodes=episodes, seed=0, canonical=True)[0]
+
+# Play one game; returns the winner (X or O) or 0 for a tie, and adds each
+# move's thinking time (ns) to the timing list of the agent making it
+def play_game(x_agent, o_agent, x_timings, o_timings):
+    x_mask = o_mask = 0
+    side = X
+    while True:
+        agent, timings = (x_agent, x_timings) if side == X else (o_agent, o_timings)
+        start = time.perf_counter_ns()
+        cell = agent.choose_move(x_mask, o_mask, side)
+        timings.append(time.perf_counter_ns() - start)
+        if side == X:
+            x_mask |= 1 << cell
+            if IS_WIN[x_mask]:
+                return X
+        else:
+            o_mask |= 1 << cell
+            if IS_WIN[o_mask]:
+                return O
+        if x_mask | o_mask == FULL_MASK:
+            return 0
+        side = O if side == X else X
+
+# Round robin: every agent plays `games` games as X against every agent as O.
+# results[a][b] holds the wins/draws/losses of `a` (moving first) against `b`.
+def run_tournament(agents, games=1000):
+    timings = {agent.name: [] for agent in agents}
+    results = {}
+    matches = []
+    for x_agent in agents:
+        results[x_agent.name] = {}
+        for o_agent in agents:
+            record = {"wins": 0, "draws": 0, "losses": 0}
+            start = time.perf_counter()
+            for _ in range(games):
+                winner = play_game(x_agent, o_agent, timings[x_agent.name],
+                                   timings[o_agent.name])
+                if winner == X:
+                    record["wins"] += 1
+                elif winner == O:
+                    record["losses"] += 1
+                else:
+                    record["draws"] += 1
+            elapsed = time.perf_counter() - start
+            results[x_agent.name][o_agent.name] = record
+            matches.append({"x": x_agent.name, "o": o_agent.name, "games": games,
+                            "seconds": elapsed, "games_per_sec": games / elapsed})
+
+    latency = {}
+    for name, samples in timings.items():
+        samples = np.array(samples) / 1000.0
+        latency[name] = {
+            "moves": len(samples),
+            "p50_us": float(np.percentile(samples, 50)),
+            "p99_us": float(np.percentile(samples, 99)),
+            "mean_us": float(samples.mean()),
+        }
+    return {"games_per_match": games, "results": results, "matches": matches,
+            "latency": latency}
+
+def print_report(report):
+    names = list(report["results"])
+    print("Win/draw/loss of the row agent (X, moves first) against the column agent (O):")
+    print(" " * 10 + "".join(f"{name:>20}" for name in names))
+    for x_name in names:
+        cells = []
+        for o_name in names:
+            record = report["results"][x_name][o_name]
+            cells.append(f"{record['wins']}/{record['draws']}/{record['losses']}")
+        print(f"{x_name:>10}" + "".join(f"{cell:>20}" for cell in cells))
+    print()
+    print(f"{'agent':>10}{'moves':>10}{'p50 us':>10}{'p99 us':>10}")
+    for name, stats in report["latency"].items():
+        print(f"{name:>10}{stats['moves']:>10}{stats['p50_us']:>10.1f}{stats['p99_us']:>10.1f}")
+    print()
+    for match in report["matches"]:
+        print(f"{match['x']:>10} vs {match['o']:<10}{match['games_per_sec']:>12,.0f} games/s")
+    if "q_policy" in report:
+        score = report["q_policy"]
+        print()
+        print(f"Q-table greedy policy is optimal in {score['optimal']:.1%} of "
+              f"{score['positions']} positions (mean value loss {score['value_loss']:.2f})")
+
+# Command line: play the round robin and print (or save) the report
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless round-robin benchmark of the tic-tac-toe agents")
+    parser.add_argument("--games", type=int, default=1000, help="games per pairing")
+    parser.add_argument("--q-table", default=Q_TABLE_FILE, help="Q-table snapshot to load")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mcts-ms", type=float, default=0,
+                        help="also play an MCTS agent with this many milliseconds per move")
+    parser.add_argument("--json", help="write the report as JSON to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    q_table = load_or_train_q_table(args.q_table)
+    agents = [RandomAgent(args.seed), MinimaxAgent(), PerfectPlayAgent(),
+              QTableAgent(q_table, args.seed)]
+    if args.mcts_ms:
+        agents.append(MCTSAgent(args.mcts_ms / 1000, args.seed))
+    report = run_tournament(agents, args.games)
+    report["q_policy"] = solver.score_q_policy(q_table)
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        print_report(report)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import numpy as np
+
+# Pure tic-tac-toe rules on bitboards: each player is a 9-bit mask where
+# bit (row * 3 + col) is set for every cell holding that player's symbol.
+# Nothing in here draws or touches pygame, so search and training can call
+# it in tight loops.
+
+EMPTY, X, O = 0, 1, 2
+ONGOING, X_WINS, O_WINS, TIE = 0, 1, 2, 3
+FULL_MASK = 0b111111111
+NUM_STATES = 3 ** 9
+
+# Rows, columns, then the two diagonals
+WIN_LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),
+             (0, 3, 6), (1, 4, 7), (2, 5, 8),
+             (0, 4, 8), (2, 4, 6))
+WIN_MASKS = tuple(sum(1 << cell for cell in line) for line in WIN_LINES)
+
+# Index of the first winning line inside every possible 9-bit mask (-1 if none)
+WIN_LINE_BY_MASK = tuple(
+    next((i for i, line in enumerate(WIN_MASKS) if mask & line == line), -1)
+    for mask in range(1 << 9))
+IS_WIN = tuple(line >= 0 for line in WIN_LINE_BY_MASK)
+
+# Cell indices of every set bit, used to list the empty cells of a board
+CELLS_BY_MASK = tuple(tuple(cell for cell in range(9) if mask >> cell & 1)
+                      for mask in range(1 << 9))
+
+# Check if a player's mask holds three in a row
+def has_won(mask):
+    return IS_WIN[mask]
+
+# Index into WIN_LINES of the line a player completed, -1 if none
+def winning_line(mask):
+    return WIN_LINE_BY_MASK[mask]
+
+# Check if no empty cell is left
+def is_full(x_mask, o_mask):
+    return x_mask | o_mask == FULL_MASK
+
+# Empty cells (0-8) of a position
+def legal_moves(x_mask, o_mask):
+    return CELLS_BY_MASK[FULL_MASK ^ (x_mask | o_mask)]
+
+# ONGOING, X_WINS, O_WINS or TIE for a position
+def outcome(x_mask, o_mask):
+    if IS_WIN[x_mask]:
+        return X_WINS
+    if IS_WIN[o_mask]:
+        return O_WINS
+    if x_mask | o_mask == FULL_MASK:
+        return TIE
+    return ONGOING
+
+# State numbers: cell c holding player p (1 = X, 2 = O) adds p * 3**c, so a
+# move or its undo changes the number by one precomputed term (like Zobrist
+# hashing) and never needs the whole board re-encoded
+PLACE_VALUES = tuple(3 ** cell for cell in range(9))
+MOVE_DELTAS = ((0,) * 9,
+               PLACE_VALUES,
+               tuple(2 * value for value in PLACE_VALUES))
+
+# State number after `player` takes `cell`
+def play(state, cell, player):
+    return state + MOVE_DELTAS[player][cell]
+
+# State number after `player`'s mark on `cell` is taken back
+def undo(state, cell, player):
+    return state - MOVE_DELTAS[player][cell]
+
+# Sum of 3**c over the set bits of every 9-bit mask, so a pair of masks
+# converts to a state number with two lookups
+TERNARY_BY_MASK = tuple(sum(PLACE_VALUES[cell] for cell in CELLS_BY_MASK[mask])
+                        for mask in range(1 << 9))
+
+# State number of a position given as two masks
+def masks_to_state(x_mask, o_mask):
+    return TERNARY_BY_MASK[x_mask] + 2 * TERNARY_BY_MASK[o_mask]
+
+# Build the two masks from a 3x3 list-of-lists board of symbols
+def board_masks(board, x_symbol, o_symbol):
+    x_mask = o_mask = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == x_symbol:
+                x_mask |= 1 << (i * 3 + j)
+            elif cell == o_symbol:
+                o_mask |= 1 << (i * 3 + j)
+    return x_mask, o_mask
+
+# Decoding tables over every state number: the 9 cell values (0 = empty,
+# 1 = X, 2 = O) and the two masks, so decoding is a lookup, not a loop
+STATE_CELLS = ((np.arange(NUM_STATES)[:, None] // np.array(PLACE_VALUES)) % 3).astype(np.int8)
+_bits = 1 << np.arange(9)
+STATE_X_MASKS = ((STATE_CELLS == X) * _bits).sum(axis=1).astype(np.int16)
+STATE_O_MASKS = ((STATE_CELLS == O) * _bits).sum(axis=1).astype(np.int16)
+_state_cells = tuple(map(tuple, STATE_CELLS.tolist()))
+_state_x_masks = STATE_X_MASKS.tolist()
+_state_o_masks = STATE_O_MASKS.tolist()
+
+# The 9 cell values of a state number as a tuple
+def state_cells(state):
+    return _state_cells[state]
+
+# The (x_mask, o_mask) pair of a state number
+def state_masks(state):
+    return _state_x_masks[state], _state_o_masks[state]
+
+# Outcome of every state number, computed once so terminal checks become a
+# single lookup
+def _compute_state_outcomes():
+    is_win = np.array(IS_WIN)
+    outcomes = np.full(NUM_STATES, ONGOING, dtype=np.int8)
+    outcomes[(STATE_X_MASKS | STATE_O_MASKS) == FULL_MASK] = TIE
+    outcomes[is_win[STATE_O_MASKS]] = O_WINS
+    outcomes[is_win[STATE_X_MASKS]] = X_WINS
+    return outcomes
+
+STATE_OUTCOMES = _compute_state_outcomes()
+_STATE_OUTCOME_BYTES = STATE_OUTCOMES.tobytes()
+
+# (3**9, 9) bool: the legal moves of every state number (none once the
+# game is over), so masking a batch of positions is one fancy index
+STATE_LEGAL_MASK = (STATE_CELLS == EMPTY) & (STATE_OUTCOMES == ONGOING)[:, None]
+
+# ONGOING, X_WINS, O_WINS or TIE for a state number
+def state_outcome(state):
+    return _STATE_OUTCOME_BYTES[state]
@@ -0,0 +1,87 @@
+import os
+import sys
+import argparse
+
+GAMES = ("qlearning", "random", "minimax", "nk")
+
+# One command line for the games, training, benchmark and solver:
+#   python . play qlearning [--episodes N]    Q-learning self-play (Q_learninginRL.py)
+#   python . play random                      random AI (TicTacToe.py)
+#   python . play minimax [--mcts]            perfect play or MCTS (mini.py)
+#   python . play nk [--size N] [--k K]       N x N, K in a row (nk_game.py)
+#   python . train [--episodes N] [--output FILE]
+#   python . bench [bench.py options]
+#   python . solve [Q-table snapshot]
+# Each command imports only the modules it needs, and pygame isn't loaded
+# until a window opens, so the headless commands never load it.
+# `play --headless` runs the game on SDL's dummy video driver (no display).
+def play(args):
+    if args.headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    if args.game == "qlearning":
+        import Q_learninginRL
+        Q_learninginRL.run(args.episodes if args.episodes is not None
+                           else Q_learninginRL.NUM_EPISODES)
+    elif args.game == "random":
+        import TicTacToe
+        TicTacToe.run()
+    elif args.game == "minimax":
+        import mini
+        mini.run(args.mcts)
+    else:
+        import nk_game
+        nk_game.run(args.size, args.k)
+
+# Train the table the Q-learning game loads on startup
+def train(args):
+    from Q_learninginRL import HEADLESS_EPISODES, Q_TABLE_FILE
+    from q_training import train_headless
+    from snapshots import save_q_table
+    episodes = HEADLESS_EPISODES if args.episodes is None else args.episodes
+    output = args.output or Q_TABLE_FILE
+    q_table, stats = train_headless(num_episodes=episodes, seed=args.seed, canonical=True)
+    save_q_table(output, q_table, episodes=stats["episodes"])
+    rate = stats["episodes"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"Trained {stats['episodes']} episodes in {stats['seconds']:.2f}s "
+          f"({rate:,.0f} episodes/s), saved to {output}")
+
+def bench(args):
+    import bench
+    bench.main(args.forwarded)
+
+def solve(args):
+    import solver
+    solver.main(args.forwarded)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python .", description="Tic-tac-toe games, training and tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play_parser = commands.add_parser("play", help="open a game window")
+    play_parser.add_argument("game", choices=GAMES)
+    play_parser.add_argument("--episodes", type=int, help="visible self-play games (qlearning)")
+    play_parser.add_argument("--mcts", action="store_true", help="tree search instead of the table (minimax)")
+    play_parser.add_argument("--size", type=int, default=4, help="board size (nk)")
+    play_parser.add_argument("--k", type=int, help="line length, default the board size (nk)")
+    play_parser.add_argument("--headless", action="store_true", help="use SDL's dummy video driver")
+    play_parser.set_defaults(run=play)
+
+    train_parser = commands.add_parser("train", help="train and save the Q-table without a window")
+    train_parser.add_argument("--episodes", type=int, help="default HEADLESS_EPISODES")
+    train_parser.add_argument("--output", help="default q_table.bin")
+    train_parser.add_argument("--seed", type=int)
+    train_parser.set_defaults(run=train)
+
+    for name, function, text in (("bench", bench, "round-robin benchmark of the agents (bench.py)"),
+                                 ("solve", solve, "rebuild the perfect-play table (solver.py)")):
+        commands.add_parser(name, help=text, add_help=False).set_defaults(run=function)
+
+    # bench and solve hand everything after the command to their own parsers
+    args, forwarded = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    if forwarded and args.run not in (bench, solve):
+        parser.error(f"unrecognized arguments: {' '.join(forwarded)}")
+    args.forwarded = forwarded
+    args.run(args)
+
+if __name__ == "__main__":
+    main()
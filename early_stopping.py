@@ -0,0 +1,164 @@
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from q_training import ALPHA, EPSILON, initialize_q_table
+from vec_env import VecTicTacToeEnv
+from schedules import SCHEDULES, as_schedule, make_schedule
+from multistep import LAMBDA, N_STEP, MODES, OPPONENTS, train_multistep, play_greedy
+
+MAX_EPISODES = 1000000
+EVAL_EVERY = 5000  # Episodes between greedy evaluations
+EVAL_GAMES = 200
+PATIENCE = 5  # Evaluations without improvement before stopping
+MIN_IMPROVEMENT = 0.01  # Score gain that counts as an improvement
+Q_TOLERANCE = 1e-3  # Stop once no Q-value moves more than this in EVAL_EVERY episodes
+
+# Stops when the evaluation score hasn't improved by more than
+# `min_improvement` over the best so far for `patience` evaluations in a row
+class PlateauDetector:
+    def __init__(self, patience=PATIENCE, min_improvement=MIN_IMPROVEMENT):
+        self.patience = patience
+        self.min_improvement = min_improvement
+        self.best = -np.inf
+        self.stale = 0
+
+    def update(self, score):
+        if score > self.best + self.min_improvement:
+            self.best = score
+            self.stale = 0
+        else:
+            self.stale += 1
+        return self.stale >= self.patience
+
+# Greedy play against the opponent; score counts a draw as half a win, so
+# the best possible score is 1.0 against random and 0.5 against minimax
+def _evaluate(q_table, canonical, opponent, games, seed, episodes):
+    start = time.perf_counter()
+    results = play_greedy(q_table, canonical, opponent, games, seed)
+    results["episodes"] = episodes
+    results["score"] = (results["wins"] + 0.5 * results["draws"]) / games
+    results["eval_seconds"] = time.perf_counter() - start
+    return results
+
+# Train with train_multistep() in chunks of `eval_every` episodes until the
+# greedy policy's score against `opponent` plateaus, no Q-value changes by
+# more than `q_tolerance` over a chunk, or `max_episodes` is reached.
+# Each evaluation runs on a copy of the table in a background process while
+# training carries on, so a plateau is noticed a chunk or so late rather
+# than pausing the trainer (background=False evaluates inline instead).
+# alpha and epsilon take numbers or schedules from schedules.py. Returns the
+# final table and a report with the stopping reason, every evaluation and
+# the best-scoring table ("best_table").
+def train_until_converged(mode="watkins", max_episodes=MAX_EPISODES, eval_every=EVAL_EVERY,
+                          opponent="minimax", eval_games=EVAL_GAMES, patience=PATIENCE,
+                          min_improvement=MIN_IMPROVEMENT, q_tolerance=Q_TOLERANCE,
+                          alpha=ALPHA, epsilon=EPSILON, lam=LAMBDA, n=N_STEP, seed=None,
+                          canonical=True, background=True, verbose=False):
+    if opponent not in OPPONENTS:
+        raise ValueError(f"Unknown opponent {opponent!r}, expected one of {OPPONENTS}")
+    alpha, epsilon = as_schedule(alpha), as_schedule(epsilon)
+    q_table = initialize_q_table(canonical)
+    rng = np.random.default_rng(seed)
+    env = VecTicTacToeEnv(min(1024, eval_every), auto_reset=False)
+    visits = np.zeros(q_table.shape, dtype=np.int64)
+    plateau = PlateauDetector(patience, min_improvement)
+    executor = None
+    if background:
+        executor = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+    pending = deque()
+    history = []
+    best_table = None
+    trained = 0
+    stop_reason = "max_episodes"
+    start = time.perf_counter()
+
+    def collect(result, table):
+        nonlocal best_table
+        history.append(result)
+        if verbose:
+            print(f"{result['episodes']:>9} episodes: score {result['score']:.3f} "
+                  f"(W {result['wins']} D {result['draws']} L {result['losses']}), "
+                  f"max Q change {result['q_delta']:.4f}, "
+                  f"epsilon {result['epsilon']:.3f}", flush=True)
+        stop = plateau.update(result["score"])
+        if plateau.stale == 0:
+            best_table = table
+        return stop
+
+    try:
+        while trained < max_episodes:
+            chunk = min(eval_every, max_episodes - trained)
+            before = q_table.copy()
+            train_multistep(q_table, chunk, mode, lam, n, alpha=alpha, epsilon=epsilon,
+                            canonical=canonical, env=env, rng=rng, first_episode=trained,
+                            visits=visits)
+            trained += chunk
+            q_delta = float(np.abs(q_table - before).max())
+            counts = visits.sum(axis=1)
+            explored = epsilon.value(trained, counts[counts > 0] if epsilon.needs_visits else None)
+            extra = {"q_delta": q_delta, "epsilon": float(np.mean(explored))}
+
+            snapshot = q_table.copy()
+            args = (snapshot, canonical, opponent, eval_games, seed, trained)
+            if executor is None:
+                stopped = collect({**_evaluate(*args), **extra}, snapshot)
+            else:
+                pending.append((executor.submit(_evaluate, *args), extra, snapshot))
+                stopped = False
+                while pending and pending[0][0].done():
+                    future, extra, snapshot = pending.popleft()
+                    stopped |= collect({**future.result(), **extra}, snapshot)
+            if stopped:
+                stop_reason = "plateau"
+                break
+            if q_delta < q_tolerance:
+                stop_reason = "q_delta"
+                break
+        # Report the evaluations still in flight too
+        for future, extra, snapshot in pending:
+            collect({**future.result(), **extra}, snapshot)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    report = {"episodes": trained, "stop_reason": stop_reason, "history": history,
+              "best_table": best_table, "seconds": time.perf_counter() - start}
+    return q_table, report
+
+def _schedule_argument(parser, name, default):
+    parser.add_argument(f"--{name}", type=float, nargs="+", default=[default], metavar="VALUE",
+                        help=f"{name} start [end length] for --{name}-schedule")
+    parser.add_argument(f"--{name}-schedule", default="constant", choices=tuple(SCHEDULES))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train until the greedy policy stops improving")
+    parser.add_argument("--mode", default="watkins", choices=MODES)
+    parser.add_argument("--opponent", default="minimax", choices=OPPONENTS)
+    parser.add_argument("--max-episodes", type=int, default=MAX_EPISODES)
+    parser.add_argument("--eval-every", type=int, default=EVAL_EVERY)
+    parser.add_argument("--eval-games", type=int, default=EVAL_GAMES)
+    parser.add_argument("--patience", type=int, default=PATIENCE)
+    parser.add_argument("--min-improvement", type=float, default=MIN_IMPROVEMENT)
+    parser.add_argument("--q-tolerance", type=float, default=Q_TOLERANCE)
+    _schedule_argument(parser, "epsilon", EPSILON)
+    _schedule_argument(parser, "alpha", ALPHA)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--inline", action="store_true",
+                        help="evaluate in the training process instead of in the background")
+    args = parser.parse_args()
+
+    epsilon = make_schedule(args.epsilon_schedule, *args.epsilon)
+    alpha = make_schedule(args.alpha_schedule, *args.alpha)
+    print(f"Training {args.mode} with epsilon {epsilon!r}, alpha {alpha!r}, "
+          f"evaluating against {args.opponent} every {args.eval_every} episodes")
+    q_table, report = train_until_converged(
+        args.mode, args.max_episodes, args.eval_every, args.opponent, args.eval_games,
+        args.patience, args.min_improvement, args.q_tolerance, alpha, epsilon, seed=args.seed,
+        background=not args.inline, verbose=True)
+    best = max(report["history"], key=lambda result: result["score"])
+    print(f"Stopped after {report['episodes']} episodes ({report['stop_reason']}) "
+          f"in {report['seconds']:.1f}s; best score {best['score']:.3f} "
+          f"at {best['episodes']} episodes")
@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import struct
+import numpy as np
+from board_core import X, O, X_WINS, O_WINS, TIE
+
+# Append-only binary log of finished games. The file starts with a 16-byte
+# header (MAGIC, version, record size) followed by one 16-byte record per
+# game, so a reader can np.memmap the whole file without parsing anything:
+#   moves      uint64  cell of move i in bits 4i..4i+3, 0xF after the last move
+#   timestamp  uint32  seconds since the epoch when the game was logged
+#   x_agent    uint8   AGENTS index of the X player
+#   o_agent    uint8   AGENTS index of the O player
+#   result     uint8   X_WINS, O_WINS or TIE (board_core.py)
+#   first      uint8   X or O, whoever moved first
+MAGIC = b"TTTG"
+VERSION = 1
+HEADER = struct.Struct("<4sII4x")
+RECORD_DTYPE = np.dtype([("moves", "<u8"), ("timestamp", "<u4"), ("x_agent", "u1"),
+                         ("o_agent", "u1"), ("result", "u1"), ("first", "u1")])
+NO_MOVE = 0xF
+BUFFER_RECORDS = 4096  # Records collected in memory before each write
+
+AGENTS = ("unknown", "human", "random", "qtable", "minimax", "perfect", "mcts", "replay")
+SHIFTS = np.arange(9, dtype=np.uint64) * np.uint64(4)
+
+def agent_id(name):
+    return AGENTS.index(name) if name in AGENTS else 0
+
+# Pack (N, 9) move arrays (-1 after the last move) into the moves column
+def pack_moves(moves):
+    nibbles = np.where(moves < 0, NO_MOVE, moves).astype(np.uint64)
+    return np.bitwise_or.reduce(nibbles << SHIFTS, axis=1)
+
+# Moves column back to (N, 9) int8 cells, -1 after the last move
+def unpack_moves(packed):
+    nibbles = (np.asarray(packed, dtype=np.uint64)[:, None] >> SHIFTS) & np.uint64(0xF)
+    return np.where(nibbles == NO_MOVE, -1, nibbles).astype(np.int8)
+
+# Buffered, append-only writer. Records are kept in a preallocated array and
+# written in blocks; call flush() (or close(), or use it as a context
+# manager) to make sure everything reached the file.
+class GameLogWriter:
+    def __init__(self, path, buffer_records=BUFFER_RECORDS):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            read_header(path)  # Refuse to append to something else
+        self.file = open(path, "ab")
+        if new_file:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        self.buffer = np.zeros(buffer_records, dtype=RECORD_DTYPE)
+        self.pending = 0
+        self.games = 0
+
+    # Log one game from its list of cells
+    def record(self, moves, result, x_agent="unknown", o_agent="unknown", first=X):
+        row = np.full((1, 9), -1, dtype=np.int8)
+        row[0, :len(moves)] = moves
+        self.record_batch(row, result, x_agent, o_agent, first)
+
+    # Log many games at once: moves is (N, 9) with -1 after the last move,
+    # result and first are scalars or arrays of N
+    def record_batch(self, moves, results, x_agent="unknown", o_agent="unknown", first=X):
+        records = np.zeros(len(moves), dtype=RECORD_DTYPE)
+        records["moves"] = pack_moves(moves)
+        records["timestamp"] = int(time.time())
+        records["x_agent"] = agent_id(x_agent)
+        records["o_agent"] = agent_id(o_agent)
+        records["result"] = results
+        records["first"] = first
+        self.games += len(records)
+
+        start = 0
+        while start < len(records):
+            count = min(len(records) - start, len(self.buffer) - self.pending)
+            self.buffer[self.pending:self.pending + count] = records[start:start + count]
+            self.pending += count
+            start += count
+            if self.pending == len(self.buffer):
+                self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write(self.buffer[:self.pending].tobytes())
+            self.pending = 0
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a game log")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} has unsupported version {version} / record size {record_size}")
+    return version, record_size
+
+# All records of a log as a read-only memory map (nothing is copied; a
+# partly written last record is ignored)
+def read_games(path):
+    read_header(path)
+    count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+
+# Walk the records in chunks, so aggregates over millions of games only
+# touch one chunk of pages at a time
+def iter_chunks(records, chunk_size=1000000):
+    for start in range(0, len(records), chunk_size):
+        yield records[start:start + chunk_size]
+
+# Games, X wins, O wins and ties for each opening move: a (9, 4) array
+def opening_stats(records, chunk_size=1000000):
+    stats = np.zeros((9, 4), dtype=np.int64)
+    for chunk in iter_chunks(records, chunk_size):
+        openings = (chunk["moves"] & np.uint64(0xF)).astype(np.int64)
+        played = openings != NO_MOVE
+        openings, results = openings[played], chunk["result"][played]
+        np.add.at(stats[:, 0], openings, 1)
+        for column, result in ((1, X_WINS), (2, O_WINS), (3, TIE)):
+            np.add.at(stats[:, column], openings[results == result], 1)
+    return stats
+
+# How often each cell was played at each ply and how often the player who
+# played it went on to win: (plays, wins) arrays of shape (9 plies, 9 cells)
+def move_win_rates(records, chunk_size=1000000):
+    plays = np.zeros((9, 9), dtype=np.int64)
+    wins = np.zeros((9, 9), dtype=np.int64)
+    plies = np.arange(9)
+    for chunk in iter_chunks(records, chunk_size):
+        moves = unpack_moves(chunk["moves"])
+        first = chunk["first"].astype(np.int64)[:, None]
+        movers = np.where(plies % 2 == 0, first, X + O - first)
+        winners = np.select([chunk["result"] == X_WINS, chunk["result"] == O_WINS], [X, O], 0)
+        played = moves >= 0
+        ply_index = np.broadcast_to(plies, moves.shape)[played]
+        cells = moves[played].astype(np.int64)
+        np.add.at(plays, (ply_index, cells), 1)
+        won = (movers == winners[:, None])[played]
+        np.add.at(wins, (ply_index[won], cells[won]), 1)
+    return plays, wins
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "games.log"
+    records = read_games(path)
+    results = np.bincount(records["result"], minlength=4)
+    print(f"{len(records)} games: X wins {results[X_WINS]}, O wins {results[O_WINS]}, "
+          f"ties {results[TIE]}")
+    print(f"{'opening':>8}{'games':>10}{'X wins':>9}{'O wins':>9}{'ties':>9}")
+    for cell, (games, x_wins, o_wins, ties) in enumerate(opening_stats(records)):
+        if games:
+            print(f"{str(divmod(cell, 3)):>8}{games:>10}{x_wins / games:>9.1%}"
+                  f"{o_wins / games:>9.1%}{ties / games:>9.1%}")
+    plays, wins = move_win_rates(records)
+    print("Win rate of the player making each move, by ply (rows) and cell (columns):")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = wins / plays
+    for ply in range(9):
+        if plays[ply].any():
+            print(f"  ply {ply + 1}: " + " ".join("   -  " if not plays[ply, cell]
+                                                 else f"{rates[ply, cell]:6.1%}"
+                                                 for cell in range(9)))
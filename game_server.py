@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from board_core import X, O, ONGOING, X_WINS, O_WINS
+from game_state import GameState
+from bench import PerfectPlayAgent, QTableAgent, MinimaxAgent, MCTSAgent, load_or_train_q_table
+
+HOST, PORT = "127.0.0.1", 8765
+POOL_WORKERS = os.cpu_count() or 1
+REPORT_INTERVAL = 10  # Seconds between the server's throughput/latency lines
+LATENCY_SAMPLES = 100000  # Most recent request latencies kept for percentiles
+LINE_LIMIT = 4096  # Longest request line in bytes; longer ones get an error reply
+
+# Protocol: one JSON object per line each way.
+#   {"op": "new", "agent": "perfect", "human": "X"}  -> new session; the AI moves
+#                                                       first if the human is O
+#   {"op": "move", "session": 1, "cell": 4}          -> human move + AI reply
+#   {"op": "close", "session": 1}
+#   {"op": "stats"}                                  -> server counters
+# Game replies carry "session", "board" (9 chars of ".XO", row by row),
+# "ai_move" (cell or null) and "status" ("playing", "x_wins", "o_wins", "tie").
+# Errors (including lines that aren't a JSON object or are longer than
+# LINE_LIMIT) come back as {"ok": false, "error": "..."}.
+STATUS_NAMES = {ONGOING: "playing", X_WINS: "x_wins", O_WINS: "o_wins"}
+
+# "perfect" (solved table) and "qtable" answer in O(1) and run right in the
+# event loop; searches go to the process pool so they never block it
+POOL_AGENTS = ("minimax", "mcts")
+_pool_agents = {}
+
+def _init_worker():
+    _pool_agents["minimax"] = MinimaxAgent()
+    _pool_agents["mcts"] = MCTSAgent()
+
+def _pool_move(agent, x_mask, o_mask, side):
+    return _pool_agents[agent].choose_move(x_mask, o_mask, side)
+
+# One player's game: X always moves first, so the side to move in `game`
+# says whose turn it is
+class Session:
+    __slots__ = ("agent", "human", "game")
+
+    def __init__(self, agent, human):
+        self.agent = agent
+        self.human = human
+        self.game = GameState()
+
+class GameServer:
+    def __init__(self, q_table=None, workers=POOL_WORKERS):
+        if q_table is None:
+            q_table = load_or_train_q_table()
+        self.table_agents = {"perfect": PerfectPlayAgent(), "qtable": QTableAgent(q_table)}
+        # Spawned rather than forked: the pool starts on first use, and forked
+        # workers would inherit the open client sockets and keep them alive
+        self.pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker)
+        self.sessions = {}
+        self.session_ids = itertools.count(1)
+        self.connections = 0
+        self.requests = 0
+        self.games = 0
+        self.latencies = np.zeros(LATENCY_SAMPLES, dtype=np.int64)  # Ring buffer, ns
+        self.started = time.perf_counter()
+
+    async def ai_move(self, session):
+        game = session.game
+        if session.agent in self.table_agents:
+            cell = self.table_agents[session.agent].choose_move(game.x_mask, game.o_mask, game.side)
+        else:
+            loop = asyncio.get_running_loop()
+            cell = await loop.run_in_executor(self.pool, _pool_move, session.agent,
+                                              game.x_mask, game.o_mask, game.side)
+        game.push(cell)
+        return cell
+
+    def _reply(self, session_id, session, ai_cell):
+        result = session.game.outcome()
+        if result != ONGOING:
+            self.games += 1
+        return {"ok": True, "session": session_id, "board": session.game.to_string(),
+                "ai_move": ai_cell, "status": STATUS_NAMES.get(result, "tie")}
+
+    async def handle(self, request, owned):
+        op = request.get("op")
+        if op == "stats":
+            return {"ok": True, **self.stats()}
+        if op == "new":
+            agent = request.get("agent", "perfect")
+            if agent not in self.table_agents and agent not in POOL_AGENTS:
+                raise ValueError(f"Unknown agent {agent!r}")
+            human = O if request.get("human", "X") == "O" else X
+            session_id = next(self.session_ids)
+            session = self.sessions[session_id] = Session(agent, human)
+            owned.add(session_id)
+            ai_cell = await self.ai_move(session) if human == O else None
+            return self._reply(session_id, session, ai_cell)
+        if op not in ("move", "close"):
+            raise ValueError(f"Unknown op {op!r}")
+
+        session_id = request.get("session")
+        session = self.sessions.get(session_id)
+        if session is None or session_id not in owned:
+            raise ValueError(f"Unknown session {session_id!r}")
+        if op == "close":
+            del self.sessions[session_id]
+            owned.discard(session_id)
+            return {"ok": True, "session": session_id}
+        if session.game.is_over():
+            raise ValueError("Game is over")
+        cell = request["cell"]
+        # JSON numbers arrive as int, float or bool; only 0-8 are cells
+        if not isinstance(cell, int) or isinstance(cell, bool) or not 0 <= cell < 9:
+            raise ValueError(f"Invalid cell {cell!r}, expected an integer from 0 to 8")
+        session.game.push(cell)
+        ai_cell = None
+        if not session.game.is_over():
+            ai_cell = await self.ai_move(session)
+        return self._reply(session_id, session, ai_cell)
+
+    async def handle_connection(self, reader, writer):
+        self.connections += 1
+        owned = set()  # Sessions of this connection, dropped when it closes
+        try:
+            while True:
+                line = await self._read_line(reader)
+                if line is None:
+                    break
+                start = time.perf_counter_ns()
+                try:
+                    if not line:
+                        raise ValueError(f"Request longer than {LINE_LIMIT} bytes")
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Request must be a JSON object")
+                    response = await self.handle(request, owned)
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"ok": False, "error": str(error)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+                self.latencies[self.requests % LATENCY_SAMPLES] = time.perf_counter_ns() - start
+                self.requests += 1
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            self.connections -= 1
+            writer.close()
+
+    # Next request line, None at the end of the stream. A line longer than
+    # LINE_LIMIT is read to its newline and dropped, and comes back as b""
+    # so the client gets an error reply and the connection stays usable.
+    async def _read_line(self, reader):
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            return error.partial or None
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+        while True:
+            try:
+                await reader.readexactly(consumed)
+                await reader.readuntil(b"\n")
+                return b""
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        samples = self.latencies[:min(self.requests, LATENCY_SAMPLES)] / 1000.0
+        return {
+            "connections": self.connections,
+            "sessions": len(self.sessions),
+            "requests": self.requests,
+            "games": self.games,
+            "requests_per_sec": self.requests / elapsed,
+            "p50_us": float(np.percentile(samples, 50)) if len(samples) else 0.0,
+            "p99_us": float(np.percentile(samples, 99)) if len(samples) else 0.0,
+        }
+
+    async def report(self, interval=REPORT_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.stats()
+            print(f"{stats['connections']} connections, {stats['sessions']} sessions, "
+                  f"{stats['requests']} requests ({stats['requests_per_sec']:,.0f}/s), "
+                  f"p50 {stats['p50_us']:.0f} us, p99 {stats['p99_us']:.0f} us", flush=True)
+
+    async def start(self, host=HOST, port=PORT):
+        return await asyncio.start_server(self.handle_connection, host, port, limit=LINE_LIMIT)
+
+    def close(self):
+        self.pool.shutdown()
+
+async def serve(host=HOST, port=PORT):
+    server = GameServer()
+    listener = await server.start(host, port)
+    print(f"Serving on {host}:{port}", flush=True)
+    try:
+        async with listener:
+            await asyncio.gather(listener.serve_forever(), server.report())
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    try:
+        asyncio.run(serve(port=port))
+    except KeyboardInterrupt:
+        pass
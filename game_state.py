@@ -0,0 +1,138 @@
+import sys
+import time
+from board_core import (X, O, EMPTY, ONGOING, X_WINS, O_WINS, TIE, FULL_MASK, CELLS_BY_MASK,
+                        MOVE_DELTAS, state_outcome, winning_line)
+
+MAX_MOVES = 9
+
+# One game of tic-tac-toe: the two bitmasks, the state number (base 3, see
+# board_core.py), the side to move and the moves so far in a fixed 9-byte
+# history. push() and pop() make and take back a move in O(1) by changing a
+# bit, adding or subtracting one precomputed term and writing one history
+# byte, so walking positions never allocates, and reset() clears the game
+# in place for the next one.
+class GameState:
+    __slots__ = ("x_mask", "o_mask", "state", "side", "count", "history")
+
+    def __init__(self, first=X):
+        self.history = bytearray(MAX_MOVES)
+        self.reset(first)
+
+    def reset(self, first=X):
+        self.x_mask = self.o_mask = self.state = self.count = 0
+        self.side = first
+
+    # Play `cell` for the side to move
+    def push(self, cell):
+        if not 0 <= cell < MAX_MOVES or (self.x_mask | self.o_mask) >> cell & 1:
+            raise ValueError(f"Illegal move {cell}")
+        bit = 1 << cell
+        side = self.side
+        if side == X:
+            self.x_mask |= bit
+        else:
+            self.o_mask |= bit
+        self.state += MOVE_DELTAS[side][cell]
+        self.history[self.count] = cell
+        self.count += 1
+        self.side = X + O - side
+
+    # Take back the last move; returns its cell
+    def pop(self):
+        if not self.count:
+            raise IndexError("No moves to take back")
+        self.count -= 1
+        cell = self.history[self.count]
+        side = self.side = X + O - self.side
+        if side == X:
+            self.x_mask &= ~(1 << cell)
+        else:
+            self.o_mask &= ~(1 << cell)
+        self.state -= MOVE_DELTAS[side][cell]
+        return cell
+
+    # ONGOING, X_WINS, O_WINS or TIE (one table lookup)
+    def outcome(self):
+        return state_outcome(self.state)
+
+    def is_over(self):
+        return state_outcome(self.state) != ONGOING
+
+    # X or O for a win, None otherwise
+    def winner(self):
+        result = state_outcome(self.state)
+        return X if result == X_WINS else O if result == O_WINS else None
+
+    # Index of the completed line in WIN_LINES, -1 if nobody has won
+    def winning_line(self):
+        result = state_outcome(self.state)
+        if result == X_WINS:
+            return winning_line(self.x_mask)
+        if result == O_WINS:
+            return winning_line(self.o_mask)
+        return -1
+
+    # Who starts the next game: the winner, or after a tie the player who
+    # didn't move last (the same rule as the games and the trainers)
+    def next_first(self):
+        return self.winner() or self.side
+
+    # Empty cells as a shared, precomputed tuple
+    def legal_moves(self):
+        return CELLS_BY_MASK[FULL_MASK ^ (self.x_mask | self.o_mask)]
+
+    def cell(self, cell):
+        return X if self.x_mask >> cell & 1 else O if self.o_mask >> cell & 1 else EMPTY
+
+    # Cells played so far, in order
+    def moves(self):
+        return list(self.history[:self.count])
+
+    def copy(self):
+        other = GameState.__new__(GameState)
+        other.x_mask, other.o_mask, other.state = self.x_mask, self.o_mask, self.state
+        other.side, other.count, other.history = self.side, self.count, bytearray(self.history)
+        return other
+
+    # Replay a list of cells (e.g. a row of game_log.unpack_moves(), whose
+    # int8 cells are converted so the bit shifts can't overflow)
+    @classmethod
+    def from_moves(cls, moves, first=X):
+        game = cls(first)
+        for cell in moves:
+            game.push(int(cell))
+        return game
+
+    # 9 characters, row by row, with the given symbols for empty, X and O
+    def to_string(self, symbols=".XO"):
+        return "".join(symbols[self.cell(cell)] for cell in range(MAX_MOVES))
+
+    def __repr__(self):
+        return f"GameState({self.to_string()!r}, side={'XO'[self.side - 1]})"
+
+RESULT_NAMES = {ONGOING: "ongoing", X_WINS: "X wins", O_WINS: "O wins", TIE: "tie"}
+
+# Walk the whole game tree with push/pop on one GameState and count the
+# positions, to show the speed and the memory per game
+if __name__ == "__main__":
+    game = GameState()
+    counts = dict.fromkeys(RESULT_NAMES, 0)
+
+    def walk():
+        result = game.outcome()
+        counts[result] += 1
+        if result == ONGOING:
+            for cell in game.legal_moves():
+                game.push(cell)
+                walk()
+                game.pop()
+
+    start = time.perf_counter()
+    walk()
+    elapsed = time.perf_counter() - start
+    nodes = sum(counts.values())
+    print(f"Walked {nodes:,} positions in {elapsed:.2f}s ({nodes / elapsed:,.0f}/s): "
+          + ", ".join(f"{counts[result]:,} {name}" for result, name in RESULT_NAMES.items()))
+    size = sys.getsizeof(game) + sys.getsizeof(game.history)
+    print(f"One game takes {size} bytes (object + history), "
+          f"about {size * 10000 / 1024:.0f} KiB for 10,000 games")
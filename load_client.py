@@ -0,0 +1,99 @@
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+import numpy as np
+from game_server import HOST, PORT, GameServer
+
+# Load generator for game_server.py: every connection plays `games` games,
+# one after another, picking random legal moves for the human side, and
+# the round trip of every request is timed. Results are counted as
+# human_wins / ai_wins / tie.
+async def play_games(host, port, games, agent, rng, latencies, results):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(request):
+        start = time.perf_counter_ns()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter_ns() - start)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response
+
+    for _ in range(games):
+        human = rng.choice("XO")
+        reply = await call({"op": "new", "agent": agent, "human": human})
+        while reply["status"] == "playing":
+            empty = [cell for cell, symbol in enumerate(reply["board"]) if symbol == "."]
+            reply = await call({"op": "move", "session": reply["session"],
+                                "cell": rng.choice(empty)})
+        if reply["status"] == "tie":
+            results["tie"] += 1
+        else:
+            results["human_wins" if reply["status"] == human.lower() + "_wins" else "ai_wins"] += 1
+        await call({"op": "close", "session": reply["session"]})
+
+    writer.close()
+    await writer.wait_closed()
+
+async def run_load(host, port, connections, games, agent, seed=None, local=False):
+    server = listener = None
+    if local:
+        # Run the server in this process, on a free port
+        server = GameServer()
+        listener = await server.start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+
+    latencies = []
+    results = Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(play_games(host, port, games, agent, random.Random(None if seed is None
+                                                                              else seed + i),
+                                      latencies, results)
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    if local:
+        while server.connections:  # Let the server see every connection close
+            await asyncio.sleep(0.01)
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+
+    samples = np.array(latencies) / 1e6
+    return {
+        "connections": connections,
+        "games": sum(results.values()),
+        "results": dict(results),
+        "requests": len(samples),
+        "seconds": elapsed,
+        "games_per_sec": sum(results.values()) / elapsed,
+        "requests_per_sec": len(samples) / elapsed,
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p99_ms": float(np.percentile(samples, 99)),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for game_server.py")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--games", type=int, default=10, help="games per connection")
+    parser.add_argument("--agent", default="perfect",
+                        choices=("perfect", "qtable", "minimax", "mcts"))
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--local", action="store_true",
+                        help="start a server in this process instead of connecting to one")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.host, args.port, args.connections, args.games,
+                                  args.agent, args.seed, args.local))
+    print(f"{report['games']} games over {report['connections']} connections in "
+          f"{report['seconds']:.2f}s: {report['games_per_sec']:,.0f} games/s, "
+          f"{report['requests_per_sec']:,.0f} requests/s")
+    print(f"Round trip p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+    print("Results:", ", ".join(f"{name} {count}" for name, count in sorted(report["results"].items())))
@@ -0,0 +1,187 @@
+import sys
+import math
+import time
+import numpy as np
+from board_core import X, O, ONGOING, X_WINS, O_WINS
+from nk_board import NKBoard
+
+TIME_BUDGET = 0.005  # Seconds per move
+ROLLOUT_BATCH = 32  # Random games played at once from every new leaf
+EXPLORATION = 1.4  # UCT exploration constant (about sqrt(2))
+
+# One position in the search tree. `wins` counts from the point of view of
+# the player who made `move` (a tie counts half), so a parent simply picks
+# the child with the best win rate for itself.
+class Node:
+    __slots__ = ("x_mask", "o_mask", "side", "parent", "move", "children", "untried",
+                 "visits", "wins", "result")
+
+    def __init__(self, board, x_mask, o_mask, side, parent=None, move=-1):
+        self.x_mask = x_mask
+        self.o_mask = o_mask
+        self.side = side  # Player to move
+        self.parent = parent
+        self.move = move
+        self.children = {}
+        self.visits = 0
+        self.wins = 0.0
+        self.result = board.outcome(x_mask, o_mask)
+        self.untried = board.legal_moves(x_mask, o_mask) if self.result == ONGOING else []
+
+# Monte Carlo tree search with UCT selection for N x N, K-in-a-row boards
+# (tic-tac-toe by default). Anytime: best_move() keeps searching until the
+# time budget runs out and then plays the most visited move. Every new leaf
+# is scored by a batch of random games played out together in NumPy, and
+# the subtree of the position actually reached is kept for the next move.
+class MCTSSearch:
+    def __init__(self, board=None, time_budget=TIME_BUDGET, batch=ROLLOUT_BATCH, seed=None):
+        self.board = NKBoard(3, 3) if board is None else board
+        self.time_budget = time_budget
+        self.batch = batch
+        self.rng = np.random.default_rng(seed)
+        self.lines = np.array(self.board.win_lines)
+        self.root = None
+        self.playouts = 0  # Random games actually played out
+        self.last_search = {}
+
+    # Play `batch` random games from a position at once. Each empty cell gets
+    # the turn at which it is filled; a player's line is complete at the
+    # latest turn of its cells, and whoever completes a line first wins.
+    # Returns the number of wins for `player` (ties count half).
+    def rollout(self, x_mask, o_mask, side, player):
+        cells = self.board.num_cells
+        empty = np.array(self.board.legal_moves(x_mask, o_mask))
+        batch = self.batch
+        self.playouts += batch
+
+        # Row b fills the empty cells in the order empty[order[b]]
+        order = self.rng.random((batch, len(empty))).argsort(axis=1)
+        filled = empty[order]
+        rows = np.arange(batch)[:, None]
+        turns = np.full((batch, cells), -1, dtype=np.int16)
+        turns[rows, filled] = np.arange(len(empty))
+
+        owners = np.zeros((batch, cells), dtype=np.int8)
+        for cell in range(cells):
+            if x_mask >> cell & 1:
+                owners[:, cell] = X
+            elif o_mask >> cell & 1:
+                owners[:, cell] = O
+        other = O if side == X else X
+        movers = np.where(np.arange(len(empty)) % 2 == 0, side, other).astype(np.int8)
+        owners[rows, filled] = movers
+
+        line_owners = owners[:, self.lines]
+        line_turns = turns[:, self.lines].max(axis=2)
+        never = cells + 1
+        x_done = np.where((line_owners == X).all(axis=2), line_turns, never).min(axis=1)
+        o_done = np.where((line_owners == O).all(axis=2), line_turns, never).min(axis=1)
+        if player == X:
+            wins, losses = x_done < o_done, o_done < x_done
+        else:
+            wins, losses = o_done < x_done, x_done < o_done
+        return float(wins.sum()) + 0.5 * float(batch - wins.sum() - losses.sum())
+
+    def _select(self, node):
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children.values(),
+                       key=lambda child: child.wins / child.visits
+                       + EXPLORATION * math.sqrt(log_visits / child.visits))
+        return node
+
+    def _expand(self, node):
+        cell = node.untried.pop(self.rng.integers(len(node.untried)))
+        x_mask, o_mask = node.x_mask, node.o_mask
+        if node.side == X:
+            x_mask |= 1 << cell
+        else:
+            o_mask |= 1 << cell
+        child = Node(self.board, x_mask, o_mask, O if node.side == X else X, node, cell)
+        node.children[cell] = child
+        return child
+
+    def _simulate(self, node):
+        mover = O if node.side == X else X  # Player who moved into `node`
+        if node.result == ONGOING:
+            return self.rollout(node.x_mask, node.o_mask, node.side, mover)
+        if node.result in (X_WINS, O_WINS):
+            won = node.result == (X_WINS if mover == X else O_WINS)
+            return float(self.batch) if won else 0.0
+        return 0.5 * self.batch
+
+    # Credit a batch of playouts up the path; each level scores it for the
+    # player who moved into that node
+    def _backpropagate(self, node, wins):
+        while node is not None:
+            node.visits += self.batch
+            node.wins += wins
+            wins = self.batch - wins
+            node = node.parent
+
+    # Node for the position, taken from the last search's tree if the game
+    # went on from there, otherwise a fresh root
+    def _find_root(self, x_mask, o_mask, side):
+        node = self.root
+        while node is not None:
+            if node.x_mask == x_mask and node.o_mask == o_mask and node.side == side:
+                node.parent = None
+                return node, True
+            if node.x_mask & ~x_mask or node.o_mask & ~o_mask:
+                break
+            node = next((child for child in node.children.values()
+                         if not child.x_mask & ~x_mask and not child.o_mask & ~o_mask), None)
+        return Node(self.board, x_mask, o_mask, side), False
+
+    # Best cell for `side` (X or O) found within the time budget, or -1 if
+    # the game is over. Details of the search are left in `last_search`.
+    def best_move(self, x_mask, o_mask, side, time_budget=None):
+        root, reused = self._find_root(x_mask, o_mask, side)
+        self.root = root
+        if root.result != ONGOING:
+            return -1
+
+        start = time.perf_counter()
+        deadline = start + (self.time_budget if time_budget is None else time_budget)
+        start_playouts = self.playouts
+        iterations = 0
+        # Always finish at least one iteration per move, so every move has a result
+        while iterations == 0 or time.perf_counter() < deadline:
+            node = self._select(root)
+            if node.untried:
+                node = self._expand(node)
+            self._backpropagate(node, self._simulate(node))
+            iterations += 1
+
+        elapsed = time.perf_counter() - start
+        playouts = self.playouts - start_playouts
+        self.last_search = {
+            "iterations": iterations,
+            "playouts": playouts,
+            "seconds": elapsed,
+            "playouts_per_sec": playouts / elapsed,
+            "root_visits": root.visits,
+            "reused": reused,
+        }
+        return max(root.children.values(), key=lambda child: child.visits).move
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else n
+    budget = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else TIME_BUDGET
+    board = NKBoard(n, k)
+    engine = MCTSSearch(board, time_budget=budget)
+    x_mask = o_mask = 0
+    side = X
+    while board.outcome(x_mask, o_mask) == ONGOING:
+        cell = engine.best_move(x_mask, o_mask, side)
+        info = engine.last_search
+        print(f"{'X' if side == X else 'O'} plays {divmod(cell, n)}: {info['playouts']} playouts "
+              f"({info['playouts_per_sec']:,.0f}/s){', reused tree' if info['reused'] else ''}")
+        if side == X:
+            x_mask |= 1 << cell
+        else:
+            o_mask |= 1 << cell
+        side = O if side == X else X
+    for row in board.to_rows(x_mask, o_mask, (".", "X", "O")):
+        print(" ".join(row))
@@ -0,0 +1,242 @@
+import sys
+import json
+import argparse
+import time
+import numpy as np
+from board_core import X, O, EMPTY, X_WINS, O_WINS, TIE, STATE_OUTCOMES, STATE_LEGAL_MASK
+from q_training import (ALPHA, GAMMA, EPSILON, IDENTITY, table_index, choose_moves, select_moves,
+                        greedy_actions, initialize_q_table)
+from vec_env import VecTicTacToeEnv
+from transitions import NEXT_STATE, TERMINAL
+from schedules import as_schedule
+import solver
+
+LAMBDA = 0.8  # Trace decay for "lambda" and "watkins"
+N_STEP = 3  # Lookahead for "nstep"
+MODES = ("q", "nstep", "lambda", "watkins")
+MAX_PLIES = 9
+CHECKPOINTS = (1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000)
+TARGET_NOT_LOST = 0.95  # Draw rate against minimax that counts as "learned"
+
+# Multi-step versions of the trainer in q_training.py. A batch of boards
+# plays whole games, then every move is backed up once, from the last move
+# of the game to the first, so the final reward reaches the opening moves
+# in the same pass. Values are for the player to move, as in replay.py:
+# the reward is 1 for the winning move, and the other player's value of the
+# next position counts against the mover, so a return alternates sign from
+# one move to the next. Only the target differs between modes:
+#   "q"        r - gamma * max Q(s')                       (one-step Q-learning)
+#   "nstep"    n alternating rewards, then the value n moves later
+#   "lambda"   r - gamma * ((1 - lam) * max Q(s') + lam * G')   (TD(lambda))
+#   "watkins"  as "lambda", but the trace is cut after an exploratory
+#              (non-greedy) move, as in Watkins's Q(lambda)
+# alpha and epsilon can be numbers or schedules (schedules.py), evaluated
+# at first_episode + the episodes trained so far. Visit counts for visit-
+# based schedules are kept in `visits` (one per table entry), which can be
+# passed back in to carry them over to the next call.
+def train_multistep(q_table=None, num_episodes=100000, mode="lambda", lam=LAMBDA, n=N_STEP,
+                    num_boards=1024, alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON, seed=None,
+                    canonical=False, env=None, rng=None, first_episode=0, visits=None):
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+    if q_table is None:
+        q_table = initialize_q_table(canonical)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    alpha, epsilon = as_schedule(alpha), as_schedule(epsilon)
+    if visits is None and (alpha.needs_visits or epsilon.needs_visits):
+        visits = np.zeros(q_table.shape, dtype=np.int64)
+    if env is None:
+        env = VecTicTacToeEnv(max(1, min(num_boards, num_episodes)), auto_reset=False)
+    stats = {"episodes": 0, "x_wins": 0, "o_wins": 0, "ties": 0, "visits": visits}
+    start_time = time.perf_counter()
+
+    while stats["episodes"] < num_episodes:
+        count = min(env.num_boards, num_episodes - stats["episodes"])
+        episode = first_episode + stats["episodes"]
+        boards = np.arange(count)
+        env.reset(boards)  # The winner of a board's last game moves first again
+
+        # One row per ply; boards whose game is already over are not valid
+        rows = np.zeros((MAX_PLIES, count), dtype=np.int64)
+        actions = np.zeros((MAX_PLIES, count), dtype=np.int64)
+        rewards = np.zeros((MAX_PLIES, count))
+        next_states = np.zeros((MAX_PLIES, count), dtype=np.int64)
+        dones = np.zeros((MAX_PLIES, count), dtype=bool)
+        valid = np.zeros((MAX_PLIES, count), dtype=bool)
+        greedy = np.zeros((MAX_PLIES, count), dtype=bool)
+
+        active = np.ones(count, dtype=bool)
+        for ply in range(MAX_PLIES):
+            idx = boards[active]
+            if not len(idx):
+                break
+            ply_rows, columns = table_index(env.states[idx], canonical)
+            q_values = np.take_along_axis(q_table[ply_rows], columns, axis=1)
+            explore = epsilon.value(episode, visits[ply_rows].sum(axis=1)
+                                    if epsilon.needs_visits else None)
+            moves = choose_moves(q_values, env.boards[idx], explore, rng)
+            picked = np.arange(len(idx)), moves
+            best = np.where(env.boards[idx] == EMPTY, q_values, -np.inf).max(axis=1)
+            greedy[ply, idx] = q_values[picked] == best
+
+            _, won, done, info = env.step(moves, idx)
+            current = info["players"]
+            rows[ply, idx] = ply_rows
+            actions[ply, idx] = columns[picked]
+            rewards[ply, idx] = won
+            next_states[ply, idx] = info["states"]
+            dones[ply, idx] = done
+            valid[ply, idx] = True
+            active[idx[done]] = False
+
+            won = won > 0
+            stats["x_wins"] += int((won & (current == X)).sum())
+            stats["o_wins"] += int((won & (current == O)).sum())
+            stats["ties"] += int((done & ~won).sum())
+
+        _backup(q_table, rows, actions, rewards, next_states, dones, valid, greedy,
+                mode, lam, n, alpha, gamma, canonical, episode, visits)
+        stats["episodes"] += count
+
+    stats["seconds"] = time.perf_counter() - start_time
+    return q_table, stats
+
+# Walk the recorded games backwards, computing each move's target from the
+# (already updated) values of the moves after it
+def _backup(q_table, rows, actions, rewards, next_states, dones, valid, greedy,
+            mode, lam, n, alpha, gamma, canonical, episode, visits):
+    plies, count = rows.shape
+    future = np.zeros((plies, count))  # -max Q(s') for the mover, 0 at the end of the game
+    returns = np.zeros(count)  # Lambda return of the following move
+    for ply in range(plies - 1, -1, -1):
+        live = valid[ply]
+        if not live.any():
+            continue
+        next_rows = table_index(next_states[ply], canonical)[0]
+        future[ply] = np.where(dones[ply], 0.0, -q_table[next_rows].max(axis=1))
+
+        if mode == "q":
+            target = rewards[ply] + gamma * future[ply]
+        elif mode == "nstep":
+            target = np.zeros(count)
+            discount = np.ones(count)  # gamma**k, negated on the other player's moves
+            running = np.ones(count, dtype=bool)  # Game not over yet within the window
+            for step in range(n):
+                later = ply + step
+                if later >= plies:
+                    break
+                target += np.where(running, discount * rewards[later], 0.0)
+                last = running & (dones[later] | (step == n - 1) | (later == plies - 1))
+                target += np.where(last, discount * gamma * future[later], 0.0)
+                running &= ~last
+                discount *= -gamma
+        else:
+            trace = np.full(count, lam)
+            if mode == "watkins" and ply + 1 < plies:
+                trace = np.where(greedy[ply + 1], lam, 0.0)
+            continued = (1 - trace) * future[ply] - trace * returns
+            target = rewards[ply] + gamma * np.where(dones[ply], 0.0, continued)
+            returns = np.where(live, target, 0.0)
+
+        idx = np.flatnonzero(live)
+        pairs = rows[ply, idx], actions[ply, idx]
+        if visits is not None:
+            np.add.at(visits, pairs, 1)
+        step = alpha.value(episode, visits[pairs] if alpha.needs_visits else None)
+        old = q_table[pairs]
+        q_table[pairs] = old + step * (target[idx] - old)
+
+OPPONENTS = ("minimax", "random")
+
+# Play `games` games of the greedy policy against a fixed opponent: "minimax"
+# (an optimal player, like mini.py's, that picks among its best moves at
+# random) or "random" (a random legal move, like TicTacToe.py's AI). Half
+# of the games the policy plays X, half O; X always moves first. All games
+# advance together, so each ply is one greedy_actions() call for the policy
+# and one select_moves() call for the opponent. Returns the policy's wins,
+# draws and losses.
+def play_greedy(q_table, canonical=False, opponent="minimax", games=200, seed=0):
+    if opponent not in OPPONENTS:
+        raise ValueError(f"Unknown opponent {opponent!r}, expected one of {OPPONENTS}")
+    rng = np.random.default_rng(seed)
+    agents = np.where(np.arange(games) % 2 == 0, X, O)
+    states = np.zeros(games, dtype=np.int64)
+    optimal = solver.load_or_solve()[1] if opponent == "minimax" else None
+    side = X
+    for _ in range(MAX_PLIES):
+        live = ~TERMINAL[states]
+        if not live.any():
+            break
+        moves = np.zeros(games, dtype=np.int64)
+        policy = live & (agents == side)
+        moves[policy] = greedy_actions(q_table, states[policy], rng=rng, canonical=canonical)
+        other = np.flatnonzero(live & (agents != side))
+        allowed = STATE_LEGAL_MASK[states[other]]
+        if optimal is not None:
+            allowed = (optimal[side - 1, states[other]][:, None] >> IDENTITY & 1).astype(bool)
+        moves[other] = select_moves(np.zeros(allowed.shape), allowed, 1.0, rng)
+        states[live] = NEXT_STATE[side - 1, states[live], moves[live]]
+        side = X + O - side
+
+    outcomes = STATE_OUTCOMES[states]
+    wins = int(((outcomes == X_WINS) & (agents == X)).sum() + ((outcomes == O_WINS) & (agents == O)).sum())
+    draws = int((outcomes == TIE).sum())
+    return {"wins": wins, "draws": draws, "losses": games - wins - draws}
+
+# Share of games the greedy policy doesn't lose against minimax. Since
+# minimax never loses, this is the policy's draw rate.
+def evaluate_vs_minimax(q_table, canonical=False, games=200, seed=0):
+    results = play_greedy(q_table, canonical, "minimax", games, seed)
+    return 1 - results["losses"] / games
+
+# Train every mode on the same seed and evaluate after each checkpoint
+def convergence_curves(checkpoints=CHECKPOINTS, seed=0, canonical=True, lam=LAMBDA, n=N_STEP,
+                       modes=MODES):
+    curves = {}
+    for mode in modes:
+        q_table = initialize_q_table(canonical)
+        rng = np.random.default_rng(seed)
+        env = VecTicTacToeEnv(1024, auto_reset=False)
+        trained = 0
+        curve = []
+        for checkpoint in checkpoints:
+            train_multistep(q_table, checkpoint - trained, mode, lam, n,
+                            canonical=canonical, env=env, rng=rng)
+            trained = checkpoint
+            curve.append({"episodes": checkpoint,
+                          "not_lost_vs_minimax": evaluate_vs_minimax(q_table, canonical),
+                          "optimal": solver.score_q_policy(q_table, canonical)["optimal"]})
+        curves[mode] = curve
+    return curves
+
+# First checkpoint at which a curve reaches `target`, or None
+def episodes_to_reach(curve, target=TARGET_NOT_LOST):
+    return next((point["episodes"] for point in curve
+                 if point["not_lost_vs_minimax"] >= target), None)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare multi-step Q-learning modes")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--lam", type=float, default=LAMBDA)
+    parser.add_argument("--n", type=int, default=N_STEP)
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=list(CHECKPOINTS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the curves as JSON")
+    args = parser.parse_args()
+
+    curves = convergence_curves(args.checkpoints, args.seed, lam=args.lam, n=args.n,
+                                modes=args.modes)
+    if args.json:
+        json.dump(curves, sys.stdout, indent=2)
+        sys.exit()
+    print(f"Games not lost against minimax (share of optimal moves), lambda={args.lam}, n={args.n}:")
+    print(f"{'episodes':>9}" + "".join(f"{mode:>16}" for mode in args.modes))
+    for i, episodes in enumerate(args.checkpoints):
+        print(f"{episodes:>9}" + "".join(
+            f"{curves[mode][i]['not_lost_vs_minimax']:>9.0%} ({curves[mode][i]['optimal']:3.0%})"
+            for mode in args.modes))
+    print(f"Episodes to reach {TARGET_NOT_LOST:.0%} not lost:")
+    for mode in args.modes:
+        reached = episodes_to_reach(curves[mode])
+        print(f"  {mode:>8}: {reached if reached else 'not within ' + str(args.checkpoints[-1])}")
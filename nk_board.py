@@ -0,0 +1,114 @@
+from board_core import ONGOING, X_WINS, O_WINS, TIE
+
+# Rules for an N x N board where K in a row wins (3, 3 is tic-tac-toe,
+# 15, 5 is Gomoku). Like board_core.py, each player is a bitmask with bit
+# (row * N + col) set for their cells, but the masks are N*N bits wide and
+# the winning lines are generated from N and K instead of listed by hand.
+
+# Every run of K cells in a row, column, diagonal or anti-diagonal, as
+# tuples of cell indices (rows first, then columns, then the diagonals)
+def generate_win_lines(n, k):
+    lines = []
+    for row_step, col_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for row in range(n):
+            for col in range(n):
+                end_row = row + row_step * (k - 1)
+                end_col = col + col_step * (k - 1)
+                if 0 <= end_row < n and 0 <= end_col < n:
+                    lines.append(tuple((row + row_step * i) * n + col + col_step * i
+                                       for i in range(k)))
+    return lines
+
+class NKBoard:
+    def __init__(self, n=3, k=3):
+        if not 1 <= k <= n:
+            raise ValueError(f"Need 1 <= K <= N, got N={n}, K={k}")
+        self.n = n
+        self.k = k
+        self.num_cells = n * n
+        self.full_mask = (1 << self.num_cells) - 1
+        self.win_lines = generate_win_lines(n, k)
+        self.win_masks = tuple(sum(1 << cell for cell in line) for line in self.win_lines)
+        # Only the lines through the last move can have just been completed
+        self.masks_by_cell = tuple(
+            tuple(mask for mask in self.win_masks if mask >> cell & 1)
+            for cell in range(self.num_cells))
+        # Cells around each cell (one step in any direction), for move generation
+        self.neighbours = tuple(self._neighbour_mask(cell) for cell in range(self.num_cells))
+
+    def _neighbour_mask(self, cell):
+        row, col = divmod(cell, self.n)
+        mask = 0
+        for r in range(max(0, row - 1), min(self.n, row + 2)):
+            for c in range(max(0, col - 1), min(self.n, col + 2)):
+                mask |= 1 << (r * self.n + c)
+        return mask & ~(1 << cell)
+
+    # Check for K in a row; pass the last move to only check lines through it
+    def has_won(self, mask, last_cell=None):
+        masks = self.win_masks if last_cell is None else self.masks_by_cell[last_cell]
+        for line in masks:
+            if mask & line == line:
+                return True
+        return False
+
+    # First winning line of a player's mask, as cell indices (None if none)
+    def winning_line(self, mask):
+        for line, line_mask in zip(self.win_lines, self.win_masks):
+            if mask & line_mask == line_mask:
+                return line
+        return None
+
+    def is_full(self, x_mask, o_mask):
+        return x_mask | o_mask == self.full_mask
+
+    # Empty cells of a position
+    def legal_moves(self, x_mask, o_mask):
+        free = self.full_mask ^ (x_mask | o_mask)
+        moves = []
+        while free:
+            low = free & -free
+            moves.append(low.bit_length() - 1)
+            free ^= low
+        return moves
+
+    # Empty cells next to a stone (every empty cell on an empty board); on
+    # big boards moves far away from the action are almost never good
+    def nearby_moves(self, x_mask, o_mask):
+        occupied = x_mask | o_mask
+        if not occupied:
+            return self.legal_moves(0, 0)
+        near = 0
+        stones = occupied
+        while stones:
+            low = stones & -stones
+            near |= self.neighbours[low.bit_length() - 1]
+            stones ^= low
+        near &= ~occupied
+        moves = []
+        while near:
+            low = near & -near
+            moves.append(low.bit_length() - 1)
+            near ^= low
+        return moves
+
+    def outcome(self, x_mask, o_mask):
+        if self.has_won(x_mask):
+            return X_WINS
+        if self.has_won(o_mask):
+            return O_WINS
+        if self.is_full(x_mask, o_mask):
+            return TIE
+        return ONGOING
+
+    # Key for sparse (dict) storage of a position: both masks packed into
+    # one int, so only positions actually visited take memory
+    def key(self, x_mask, o_mask):
+        return x_mask | o_mask << self.num_cells
+
+    # List-of-lists board of symbols, e.g. for BoardRenderer.set_board()
+    def to_rows(self, x_mask, o_mask, symbols=(" ", "X", "O")):
+        return [[symbols[1] if x_mask >> (r * self.n + c) & 1
+                 else symbols[2] if o_mask >> (r * self.n + c) & 1
+                 else symbols[0]
+                 for c in range(self.n)] for r in range(self.n)]
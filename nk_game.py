@@ -0,0 +1,105 @@
+import sys
+from board_core import X, O, ONGOING, X_WINS, O_WINS
+from nk_board import NKBoard
+from nk_search import NKSearch
+from rendering import BoardRenderer, MoveTimer
+
+AI_MOVE_DELAY = 500  # Milliseconds between moves, so they are visible
+RESTART_DELAY = 2000  # Milliseconds the finished board stays up before a new game
+
+# Board, engine and window, created by run(N, K)
+board = engine = renderer = None
+
+# Game variables
+x_mask = o_mask = 0
+current_player = X
+game_over = False
+
+# Score counters
+x_wins = 0
+o_wins = 0
+ties = 0
+
+# Draw the game status
+def draw_status():
+    result = board.outcome(x_mask, o_mask)
+    if result == X_WINS:
+        message = "X Wins!"
+    elif result == O_WINS:
+        message = "O Wins!"
+    elif result != ONGOING:
+        message = "It's a Tie!"
+    else:
+        message = f"Player {'X' if current_player == X else 'O'}'s Turn"
+
+    renderer.set_status(message)
+    renderer.set_score(f"X: {x_wins}  O: {o_wins}  Ties: {ties}")
+
+# Reset the game after a win or tie
+def reset_game():
+    global x_mask, o_mask, current_player, game_over
+    x_mask = o_mask = 0
+    current_player = X
+    game_over = False
+    renderer.set_win_cells(None)
+
+# Main game loop: one frame per call
+def main():
+    global x_mask, o_mask, current_player, game_over, x_wins, o_wins, ties
+
+    renderer.handle_events()
+
+    # After the game ends, leave the board up for a moment before restarting
+    if game_over:
+        if restart_timer.ready():
+            reset_game()
+            move_timer.restart()
+
+    elif move_timer.ready():
+        # Both players are the time-limited search
+        cell = engine.best_move(x_mask, o_mask, current_player)
+        if current_player == X:
+            x_mask |= 1 << cell
+        else:
+            o_mask |= 1 << cell
+        current_player = O if current_player == X else X
+
+        # Check for game-over condition after the move
+        result = board.outcome(x_mask, o_mask)
+        if result != ONGOING:
+            game_over = True
+            if result == X_WINS:
+                x_wins += 1
+                line = board.winning_line(x_mask)
+            elif result == O_WINS:
+                o_wins += 1
+                line = board.winning_line(o_mask)
+            else:
+                ties += 1
+                line = None
+            if line is not None:
+                renderer.set_win_cells((line[0], line[-1]))
+            restart_timer.restart()
+
+    renderer.set_board(board.to_rows(x_mask, o_mask))
+    draw_status()
+    renderer.render()
+    renderer.tick()
+
+# Open the window and let the engine play N x N, K in a row until it is closed
+def run(n=4, k=None):
+    global board, engine, renderer, move_timer, restart_timer
+    k = n if k is None else k
+    board = NKBoard(n, k)
+    engine = NKSearch(board)
+    renderer = BoardRenderer(f"{n}x{n}, {k} in a row", size=n)
+    move_timer = MoveTimer(AI_MOVE_DELAY)
+    restart_timer = MoveTimer(RESTART_DELAY)
+    while True:
+        main()
+
+# Board size and line length from the command line: nk_game.py N K
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    run(n, int(sys.argv[2]) if len(sys.argv) > 2 else n)
+
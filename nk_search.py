@@ -0,0 +1,170 @@
+import sys
+import time
+from board_core import X, ONGOING
+from nk_board import NKBoard
+
+# A win is worth WIN_SCORE plus the empty cells left (faster wins score
+# higher); heuristic scores of unfinished lines always stay far below it
+WIN_SCORE = 1000000
+INFINITY = 10 * WIN_SCORE
+TIME_BUDGET = 0.5  # Seconds per move
+# Boards at least this wide only consider cells next to a stone; on smaller
+# ones every empty cell is searched, so 3x3 and 4x4 play stays exact
+NEARBY_MIN_SIZE = 5
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class SearchTimeout(Exception):
+    pass
+
+# Depth-limited negamax with alpha-beta pruning for N x N, K-in-a-row
+# boards. Iterative deepening runs depth 1, 2, 3, ... until the time budget
+# runs out and plays the best move of the deepest finished search. The
+# transposition table is a dict keyed on both masks, so it only grows with
+# the positions actually visited, and its best moves are tried first at
+# the next depth.
+class NKSearch:
+    def __init__(self, board, time_budget=TIME_BUDGET):
+        self.board = board
+        self.time_budget = time_budget
+        self.table = {}
+        self.nodes = 0
+        self.deadline = 0.0
+        self.last_search = {}
+        # Unfinished line with c of our stones and none of theirs is worth 4**c
+        self.line_weights = tuple(4 ** count if count else 0 for count in range(board.k))
+        # Static move order: cells on more winning lines first (center first)
+        self.cell_priority = tuple(-len(masks) for masks in board.masks_by_cell)
+        self.generate_moves = (board.nearby_moves if board.n >= NEARBY_MIN_SIZE
+                               else board.legal_moves)
+
+    # Heuristic score of an unfinished position for the side to move
+    def evaluate(self, me, them):
+        score = 0
+        weights = self.line_weights
+        for line in self.board.win_masks:
+            mine = me & line
+            theirs = them & line
+            if not theirs:
+                score += weights[mine.bit_count()]
+            elif not mine:
+                score -= weights[theirs.bit_count()]
+        return score
+
+    def _ordered_moves(self, me, them, first=None):
+        moves = self.generate_moves(me, them)
+        moves.sort(key=self.cell_priority.__getitem__)
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def _negamax(self, me, them, depth, alpha, beta, last_cell):
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        board = self.board
+        occupied = me | them
+        if last_cell is not None and board.has_won(them, last_cell):
+            return -(WIN_SCORE + board.num_cells - occupied.bit_count())
+        if occupied == board.full_mask:
+            return 0
+        if depth == 0:
+            return self.evaluate(me, them)
+
+        key = board.key(me, them)
+        entry = self.table.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, flag, value, tt_move = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        alpha_orig = alpha
+        best = -INFINITY
+        best_move = None
+        for cell in self._ordered_moves(me, them, tt_move):
+            value = -self._negamax(them, me | 1 << cell, depth - 1, -beta, -alpha, cell)
+            if value > best:
+                best, best_move = value, cell
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+
+        flag = UPPER if best <= alpha_orig else LOWER if best >= beta else EXACT
+        self.table[key] = (depth, flag, best, best_move)
+        return best
+
+    def _search_root(self, me, them, depth, first):
+        best = alpha = -INFINITY
+        best_move = None
+        for cell in self._ordered_moves(me, them, first):
+            value = -self._negamax(them, me | 1 << cell, depth - 1, -INFINITY, -alpha, cell)
+            if value > best:
+                best, best_move = value, cell
+                alpha = max(alpha, best)
+        return best_move, best
+
+    # Best cell for `side` (X or O) found within the time budget, or -1 if
+    # the game is over. Details of the search are left in `last_search`.
+    def best_move(self, x_mask, o_mask, side, time_budget=None, max_depth=None):
+        board = self.board
+        me, them = (x_mask, o_mask) if side == X else (o_mask, x_mask)
+        if board.has_won(them) or board.has_won(me) or board.is_full(me, them):
+            return -1
+        empties = board.num_cells - (me | them).bit_count()
+        max_depth = min(max_depth or empties, empties)
+
+        start = time.perf_counter()
+        self.deadline = start + (self.time_budget if time_budget is None else time_budget)
+        start_nodes = self.nodes
+        move = self._ordered_moves(me, them)[0]
+        score = 0
+        depth_reached = 0
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self._search_root(me, them, depth, move)
+            except SearchTimeout:
+                break
+            depth_reached = depth
+            if abs(score) >= WIN_SCORE:
+                break  # The result is forced; deeper search can't change it
+
+        self.last_search = {
+            "depth": depth_reached,
+            "score": score,
+            "nodes": self.nodes - start_nodes,
+            "seconds": time.perf_counter() - start,
+            "table_size": len(self.table),
+        }
+        return move
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else n
+    board = NKBoard(n, k)
+    engine = NKSearch(board)
+    x_mask = o_mask = 0
+    side = X
+    while board.outcome(x_mask, o_mask) == ONGOING:
+        cell = engine.best_move(x_mask, o_mask, side)
+        info = engine.last_search
+        print(f"{'X' if side == X else 'O'} plays {divmod(cell, n)}: depth {info['depth']}, "
+              f"{info['nodes']} nodes in {info['seconds'] * 1000:.0f} ms")
+        if side == X:
+            x_mask |= 1 << cell
+        else:
+            o_mask |= 1 << cell
+        side = 3 - side
+    for row in board.to_rows(x_mask, o_mask, (".", "X", "O")):
+        print(" ".join(row))
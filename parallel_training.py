@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from q_training import ALPHA, GAMMA, EPSILON, initialize_q_table, train_headless
+
+# Settings for parallel training
+NUM_WORKERS = os.cpu_count() or 1
+SYNC_INTERVAL = 50000  # Episodes each worker plays between merges
+
+# Worker for "merge" mode: train a private copy of the table and send it back
+def _train_copy(args):
+    q_table, num_episodes, seed, settings = args
+    return train_headless(q_table, num_episodes=num_episodes, seed=seed, **settings)
+
+# Worker for "shared" mode: train directly on the table in shared memory.
+# Updates from different workers race without locks (Hogwild-style), which
+# is harmless for Q-learning but makes runs non-reproducible.
+def _train_shared(args):
+    name, shape, num_episodes, seed, settings = args
+    memory = shared_memory.SharedMemory(name=name)
+    # The parent owns the segment; don't let this worker's exit unlink it
+    resource_tracker.unregister(memory._name, "shared_memory")
+    q_table = np.ndarray(shape, dtype=np.float32, buffer=memory.buf)
+    try:
+        return train_headless(q_table, num_episodes=num_episodes, seed=seed, **settings)[1]
+    finally:
+        del q_table
+        memory.close()
+
+def _add_stats(total, stats):
+    for key in ("episodes", "x_wins", "o_wins", "ties"):
+        total[key] += stats[key]
+
+# Fold the workers' copies back into `q_table`: each entry moves by the
+# mean change of the workers that changed it. A plain mean of the copies
+# would also count the workers that never visited a rarely seen state, and
+# shrink its update by up to the number of workers.
+def merge_tables(q_table, tables):
+    deltas = np.stack(tables) - q_table
+    updated = np.count_nonzero(deltas, axis=0)
+    q_table += deltas.sum(axis=0) / np.maximum(updated, 1)
+    return q_table
+
+# Self-play Q-learning on several processes. In "merge" mode every worker
+# trains a local copy for `sync_interval` episodes, then the copies are
+# merged into the shared table (merge_tables()); with the same seed a run
+# is reproducible.
+# In "shared" mode all workers update one table in shared memory.
+def train_parallel(q_table=None, num_episodes=1000000, num_workers=NUM_WORKERS,
+                   sync_interval=SYNC_INTERVAL, mode="merge", seed=None,
+                   alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON, canonical=False,
+                   num_boards=4096):
+    if mode not in ("merge", "shared"):
+        raise ValueError(f"Unknown training mode: {mode}")
+    if q_table is None:
+        q_table = initialize_q_table(canonical)
+    settings = {"alpha": alpha, "gamma": gamma, "epsilon": epsilon,
+                "canonical": canonical, "num_boards": num_boards}
+    total = {"episodes": 0, "x_wins": 0, "o_wins": 0, "ties": 0}
+    start_time = time.perf_counter()
+
+    with mp.Pool(num_workers) as pool:
+        if mode == "merge":
+            rounds = max(1, -(-num_episodes // (num_workers * sync_interval)))
+            seeds = np.random.SeedSequence(seed).spawn(rounds * num_workers)
+            remaining = num_episodes
+            for round_num in range(rounds):
+                shares = [min(sync_interval, max(0, remaining - i * sync_interval))
+                          for i in range(num_workers)]
+                shares = [share for share in shares if share > 0]
+                jobs = [(q_table, share, seeds[round_num * num_workers + i], settings)
+                        for i, share in enumerate(shares)]
+                results = pool.map(_train_copy, jobs)
+                merge_tables(q_table, [table for table, _ in results])
+                for _, stats in results:
+                    _add_stats(total, stats)
+                remaining -= sum(shares)
+        else:
+            memory = shared_memory.SharedMemory(create=True, size=q_table.nbytes)
+            try:
+                shared = np.ndarray(q_table.shape, dtype=np.float32, buffer=memory.buf)
+                shared[:] = q_table
+                seeds = np.random.SeedSequence(seed).spawn(num_workers)
+                shares = [num_episodes // num_workers + (i < num_episodes % num_workers)
+                          for i in range(num_workers)]
+                jobs = [(memory.name, q_table.shape, share, seeds[i], settings)
+                        for i, share in enumerate(shares) if share > 0]
+                for stats in pool.map(_train_shared, jobs):
+                    _add_stats(total, stats)
+                q_table[:] = shared
+                del shared
+            finally:
+                memory.close()
+                memory.unlink()
+
+    total["seconds"] = time.perf_counter() - start_time
+    return q_table, total
+
+if __name__ == "__main__":
+    episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    mode = sys.argv[2] if len(sys.argv) > 2 else "merge"
+    base_rate = None
+    workers = 1
+    while workers <= NUM_WORKERS:
+        _, stats = train_parallel(num_episodes=episodes, num_workers=workers,
+                                  mode=mode, seed=0, canonical=True)
+        rate = stats["episodes"] / stats["seconds"]
+        base_rate = base_rate or rate
+        print(f"{workers:3d} workers: {rate:12,.0f} episodes/s  "
+              f"({rate / base_rate:.2f}x)")
+        workers *= 2
@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from collections import defaultdict
+
+# Opt-in timers and counters for the game loops. Set TTT_PROFILE=1 to turn
+# them on; a summary is printed to stderr every TTT_PROFILE_INTERVAL seconds
+# (by a background timer, so headless runs report too) and at exit, and TTT_PROFILE_TRACE=trace.json also writes every timed
+# phase as a Chrome trace (open it in chrome://tracing or ui.perfetto.dev).
+# When profiling is off, phase() hands back one shared do-nothing context
+# manager and count() returns at once, so the instrumented code pays almost
+# nothing.
+ENABLED = os.environ.get("TTT_PROFILE", "") not in ("", "0")
+TRACE_FILE = os.environ.get("TTT_PROFILE_TRACE") or None
+SUMMARY_INTERVAL = float(os.environ.get("TTT_PROFILE_INTERVAL", 10))
+MAX_TRACE_EVENTS = 1000000  # Stop recording trace events after this many
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_PHASE = _NullPhase()
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+class Profiler:
+    def __init__(self, enabled=ENABLED, trace=TRACE_FILE is not None):
+        self.enabled = enabled
+        self.trace = trace
+        self.reset()
+
+    def reset(self):
+        self.totals = defaultdict(int)  # phase -> total ns
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.events = []  # (phase, start ns, duration ns) for the trace
+        self.origin = self.last_report = time.perf_counter_ns()
+
+    # Time a block: `with profiler.phase("draw"): ...`
+    def phase(self, name):
+        if not self.enabled:
+            return NULL_PHASE
+        return _Phase(self, name)
+
+    def record(self, name, start, end):
+        self.totals[name] += end - start
+        self.calls[name] += 1
+        if self.trace and len(self.events) < MAX_TRACE_EVENTS:
+            self.events.append((name, start, end - start))
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    # Totals since the start (or the last reset); "share" is the fraction of
+    # wall-clock time spent in each phase
+    def summary(self):
+        wall = time.perf_counter_ns() - self.origin
+        phases = {}
+        # Copies first: the report timer reads these while the game adds to them
+        for name, total in sorted(list(self.totals.items()), key=lambda item: -item[1]):
+            calls = self.calls[name]
+            phases[name] = {"calls": calls, "total_ms": total / 1e6,
+                            "mean_us": total / calls / 1e3, "share": total / wall}
+        return {"wall_ms": wall / 1e6, "phases": phases, "counters": dict(self.counters)}
+
+    def format_summary(self):
+        summary = self.summary()
+        lines = [f"profile after {summary['wall_ms'] / 1000:.1f} s:",
+                 f"  {'phase':<14}{'calls':>10}{'total ms':>12}{'mean us':>12}{'share':>8}"]
+        for name, phase in summary["phases"].items():
+            lines.append(f"  {name:<14}{phase['calls']:>10}{phase['total_ms']:>12.1f}"
+                         f"{phase['mean_us']:>12.1f}{phase['share']:>8.1%}")
+        for name, value in summary["counters"].items():
+            lines.append(f"  {name:<14}{value:>10}")
+        return "\n".join(lines)
+
+    # Print the summary if `interval` seconds have passed since the last one;
+    # the render loop calls it once per frame and the report timer between
+    def maybe_report(self, interval=SUMMARY_INTERVAL, file=None):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if now - self.last_report >= interval * 1e9:
+            self.last_report = now
+            print(self.format_summary(), file=file or sys.stderr)
+
+    # Background thread that checks for a due summary every `interval`
+    # seconds, for loops that never reach a renderer (bench.py, trainers)
+    def start_report_timer(self, interval=SUMMARY_INTERVAL, file=None):
+        def run():
+            while True:
+                time.sleep(interval)
+                self.maybe_report(interval, file)
+
+        thread = threading.Thread(target=run, name="profile-report", daemon=True)
+        thread.start()
+        return thread
+
+    # Chrome trace event format: one complete ("X") event per timed phase,
+    # timestamps in microseconds, plus the final counter values
+    def write_trace(self, path):
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "ts": (start - self.origin) / 1e3,
+                   "dur": duration / 1e3, "pid": pid, "tid": 0}
+                  for name, start, duration in self.events]
+        end = (time.perf_counter_ns() - self.origin) / 1e3
+        events.extend({"name": name, "ph": "C", "ts": end, "pid": pid, "tid": 0,
+                       "args": {name: value}} for name, value in self.counters.items())
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+# The profiler the games share
+profiler = Profiler()
+
+def _report_at_exit():
+    print(profiler.format_summary(), file=sys.stderr)
+    if TRACE_FILE:
+        profiler.write_trace(TRACE_FILE)
+
+if profiler.enabled:
+    atexit.register(_report_at_exit)
+    profiler.start_report_timer()
@@ -0,0 +1,187 @@
+import sys
+import numpy as np
+
+SLAB_ROWS = 1024  # Rows allocated together in one contiguous float32 block
+EVICT_FRACTION = 16  # A full store evicts 1/16 of its rows at once
+
+# Q-value storage backends. Both answer the same calls, so the game code
+# does not care which one holds the table:
+#   row(key)                         Q-values of a state (read only)
+#   row_for_update(key)              writable Q-values, allocated on first use
+#   update(key, action, target, alpha)  Q += alpha * (target - Q)
+#   gather(keys, actions)            Q-values of many (state, action) pairs
+#   max_values(keys)                 best Q-value of many states
+#   scatter_add(keys, actions, deltas)  Q += delta, summing repeated pairs
+#   stats()                          resident rows and memory footprint
+
+# Dense array indexed by state number: the layout q_training.py trains and
+# snapshots.py saves
+class DenseQStore:
+    def __init__(self, table):
+        self.table = table
+
+    def row(self, key):
+        return self.table[key]
+
+    def row_for_update(self, key):
+        return self.table[key]
+
+    def update(self, key, action, target, alpha):
+        row = self.table[key]
+        row[action] += alpha * (target - row[action])
+
+    def gather(self, keys, actions):
+        return self.table[keys, actions]
+
+    def max_values(self, keys):
+        return self.table[keys].max(axis=1)
+
+    def scatter_add(self, keys, actions, deltas):
+        np.add.at(self.table, (keys, actions), deltas)
+
+    def __contains__(self, key):
+        return 0 <= key < len(self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+    def stats(self):
+        return {"rows": len(self.table), "capacity": len(self.table), "slabs": 1,
+                "table_bytes": self.table.nbytes, "index_bytes": 0,
+                "hits": 0, "misses": 0, "evictions": 0}
+
+# Rows allocated on the first update of a state, for state spaces too big to
+# allocate up front (larger boards, keyed e.g. by NKBoard.key()). Rows live
+# in float32 slabs of `slab_rows` rows and a dict maps each key to its slot.
+# With `max_rows` set, a full store evicts its least recently ("lru") or
+# least frequently ("lfu") used rows; evicted states read as all zeros again.
+class SparseQStore:
+    def __init__(self, num_actions=9, max_rows=None, eviction="lru", slab_rows=SLAB_ROWS):
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy {eviction!r}")
+        self.num_actions = num_actions
+        self.max_rows = max_rows
+        self.eviction = eviction
+        self.slab_rows = slab_rows
+        self.slots = {}  # key -> slot
+        self.keys = []  # slot -> key, None for a free slot
+        self.slabs = []
+        self.free = []
+        # Per-slot bookkeeping for eviction
+        self.last_used = np.zeros(0, dtype=np.int64)
+        self.visits = np.zeros(0, dtype=np.int64)
+        self.clock = 0
+        self.hits = self.misses = self.evictions = 0
+        # What unvisited states read as; never written
+        self.zero_row = np.zeros(num_actions, dtype=np.float32)
+        self.zero_row.flags.writeable = False
+
+    def _slot_row(self, slot):
+        return self.slabs[slot // self.slab_rows][slot % self.slab_rows]
+
+    def _touch(self, slot):
+        self.clock += 1
+        self.last_used[slot] = self.clock
+        self.visits[slot] += 1
+
+    def row(self, key):
+        slot = self.slots.get(key)
+        if slot is None:
+            self.misses += 1
+            return self.zero_row
+        self.hits += 1
+        self._touch(slot)
+        return self._slot_row(slot)
+
+    def row_for_update(self, key):
+        slot = self.slots.get(key)
+        if slot is None:
+            self.misses += 1
+            slot = self._allocate(key)
+        else:
+            self.hits += 1
+        self._touch(slot)
+        return self._slot_row(slot)
+
+    def update(self, key, action, target, alpha):
+        row = self.row_for_update(key)
+        row[action] += alpha * (target - row[action])
+
+    def gather(self, keys, actions):
+        pairs = zip(keys.tolist(), actions.tolist())
+        return np.array([self.row(key)[action] for key, action in pairs], dtype=np.float32)
+
+    def max_values(self, keys):
+        return np.array([self.row(key).max() for key in keys.tolist()], dtype=np.float32)
+
+    def scatter_add(self, keys, actions, deltas):
+        for key, action, delta in zip(keys.tolist(), actions.tolist(), deltas.tolist()):
+            self.row_for_update(key)[action] += delta
+
+    def _allocate(self, key):
+        if not self.free:
+            if self.max_rows is not None and len(self.slots) >= self.max_rows:
+                self._evict()
+            else:
+                self._add_slab()
+        slot = self.free.pop()
+        self.slots[key] = slot
+        self.keys[slot] = key
+        self.visits[slot] = 0
+        self._slot_row(slot)[:] = 0
+        return slot
+
+    def _add_slab(self):
+        start = len(self.keys)
+        rows = self.slab_rows
+        if self.max_rows is not None:
+            rows = min(rows, self.max_rows - start)
+        self.slabs.append(np.zeros((rows, self.num_actions), dtype=np.float32))
+        self.keys.extend([None] * rows)
+        self.last_used = np.concatenate([self.last_used, np.zeros(rows, dtype=np.int64)])
+        self.visits = np.concatenate([self.visits, np.zeros(rows, dtype=np.int64)])
+        self.free.extend(range(start + rows - 1, start - 1, -1))  # Lowest slot first
+
+    # Free a batch of rows at once, so eviction isn't a scan on every insert
+    def _evict(self):
+        slots = np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))
+        count = max(1, len(slots) // EVICT_FRACTION)
+        if self.eviction == "lru":
+            victims = slots[np.argpartition(self.last_used[slots], count - 1)[:count]]
+        else:
+            # Fewest visits first, least recently used among equals
+            victims = slots[np.lexsort((self.last_used[slots], self.visits[slots]))[:count]]
+        for slot in victims.tolist():
+            del self.slots[self.keys[slot]]
+            self.keys[slot] = None
+            self.free.append(slot)
+        self.evictions += count
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def __len__(self):
+        return len(self.slots)
+
+    def stats(self):
+        return {"rows": len(self.slots), "capacity": len(self.keys), "slabs": len(self.slabs),
+                "table_bytes": sum(slab.nbytes for slab in self.slabs),
+                "index_bytes": (sys.getsizeof(self.slots) + sys.getsizeof(self.keys)
+                                + self.last_used.nbytes + self.visits.nbytes),
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    # Copy the rows into a dense table (keys must be row numbers < num_rows),
+    # e.g. to save it with snapshots.save_q_table()
+    def to_dense(self, num_rows):
+        table = np.zeros((num_rows, self.num_actions), dtype=np.float32)
+        for key, slot in self.slots.items():
+            table[key] = self._slot_row(slot)
+        return table
+
+    # Sparse copy of a dense table holding only its non-zero rows
+    @classmethod
+    def from_dense(cls, table, **kwargs):
+        store = cls(num_actions=table.shape[1], **kwargs)
+        for key in np.flatnonzero(np.any(table != 0, axis=1)).tolist():
+            store.row_for_update(key)[:] = table[key]
+        return store
@@ -0,0 +1,146 @@
+import sys
+import time
+import numpy as np
+from board_core import EMPTY, X, O, NUM_STATES, X_WINS, O_WINS, TIE, STATE_LEGAL_MASK
+from symmetry import (NUM_CANONICAL_STATES, CANONICAL_ROWS, CANONICAL_TRANSFORMS,
+                      TRANSFORM_ARRAY)
+from vec_env import VecTicTacToeEnv
+
+# Q-learning constants (same values as Q_learninginRL.py)
+ALPHA = 0.1      # Learning rate
+GAMMA = 0.9      # Discount factor
+EPSILON = 0.2    # Exploration rate
+
+# Board encoding: 0 = empty, 1 = 'X', 2 = 'O' (same mapping as state_to_number)
+NUM_ACTIONS = 9
+IDENTITY = np.arange(NUM_ACTIONS)
+
+# Dense Q-table: one row of 9 action values per state number, or per
+# canonical state (one of every 8 symmetric boards, see symmetry.py)
+def initialize_q_table(canonical=False):
+    num_rows = NUM_CANONICAL_STATES if canonical else NUM_STATES
+    return np.zeros((num_rows, NUM_ACTIONS), dtype=np.float32)
+
+# Q-table row of each state and the column holding each of its 9 actions
+def table_index(states, canonical=False):
+    if not canonical:
+        return states, np.broadcast_to(IDENTITY, (len(states), NUM_ACTIONS))
+    return CANONICAL_ROWS[states], TRANSFORM_ARRAY[CANONICAL_TRANSFORMS[states]]
+
+# Pick one move per row of q_values (cells in board order) among the cells
+# allowed by the matching row of `legal`: a random legal move with
+# probability epsilon (a number or one per row), otherwise a random move
+# among the legal moves with the highest Q-value. Rows with no legal move
+# get -1.
+def select_moves(q_values, legal, epsilon, rng):
+    q_values = np.where(legal, q_values, -np.inf)
+    best = legal & (q_values == q_values.max(axis=1, keepdims=True))
+    explore = rng.random(len(legal)) < epsilon
+    candidates = np.where(explore[:, None], legal, best)
+    keys = np.where(candidates, rng.random(legal.shape), -1.0)
+    return np.where(legal.any(axis=1), keys.argmax(axis=1), -1)
+
+# select_moves() for boards given as (B, 9) cell arrays
+def choose_moves(q_values, boards, epsilon, rng):
+    return select_moves(q_values, boards == EMPTY, epsilon, rng)
+
+# Greedy (or with epsilon > 0, epsilon-greedy) moves of a Q-table for a
+# whole array of state numbers in one vectorized call: illegal cells are
+# masked with STATE_LEGAL_MASK and ties go to a random best move, drawn from
+# `rng` (a seeded np.random.Generator for reproducible answers). Returns one
+# cell per state, -1 where the game is already over.
+def greedy_actions(q_table, states, epsilon=0.0, rng=None, canonical=None):
+    states = np.asarray(states, dtype=np.int64)
+    if canonical is None:
+        canonical = q_table.shape[0] != NUM_STATES
+    if rng is None:
+        rng = np.random.default_rng()
+    rows, columns = table_index(states, canonical)
+    q_values = np.take_along_axis(q_table[rows], columns, axis=1)
+    return select_moves(q_values, STATE_LEGAL_MASK[states], epsilon, rng)
+
+# Train the Q-table by self-play on `num_boards` independent boards at once.
+# Uses the same update rule as ai_move() in Q_learninginRL.py: both players
+# share the table, rewards are from O's point of view (+1 O wins, -1 X wins),
+# the winner starts the next game and the starter alternates after a tie.
+# With canonical=True the table has one row per canonical state, so every
+# game also trains the 7 boards symmetric to the ones it visits. Pass a
+# game_log.GameLogWriter as game_log to record every finished game.
+def train_headless(q_table=None, num_episodes=100000, num_boards=4096,
+                   alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON, seed=None,
+                   canonical=False, game_log=None):
+    if q_table is None:
+        q_table = initialize_q_table(canonical)
+    rng = np.random.default_rng(seed)
+    num_boards = max(1, min(num_boards, num_episodes))
+
+    # Boards are restarted here rather than by the environment, so that no
+    # more than num_episodes games are started
+    env = VecTicTacToeEnv(num_boards, auto_reset=False)
+    active = np.ones(num_boards, dtype=bool)
+    started = num_boards
+    x_wins = o_wins = ties = 0
+    if game_log is not None:
+        histories = np.full((num_boards, 9), -1, dtype=np.int8)
+        plies = np.zeros(num_boards, dtype=np.int64)
+        starters = np.full(num_boards, X, dtype=np.int8)
+    start_time = time.perf_counter()
+
+    while active.any():
+        idx = np.flatnonzero(active)
+        rows, columns = table_index(env.states[idx], canonical)
+        q_values = np.take_along_axis(q_table[rows], columns, axis=1)
+        moves = choose_moves(q_values, env.boards[idx], epsilon, rng)
+        actions = columns[np.arange(len(idx)), moves]
+        _, rewards, done, info = env.step(moves, idx)
+        current, new_states = info["players"], info["states"]
+        won = rewards > 0
+        full = done & ~won
+        reward = np.where(won, np.where(current == O, 1.0, -1.0), 0.0)
+
+        # Boards that hit the same (state, action) in one step apply a single
+        # update computed from the old value instead of stacking them
+        new_rows = table_index(new_states, canonical)[0]
+        future = np.where(done, 0.0, q_table[new_rows].max(axis=1))
+        old = q_table[rows, actions]
+        q_table[rows, actions] = old + alpha * (reward + gamma * future - old)
+
+        x_wins += int((won & (current == X)).sum())
+        o_wins += int((won & (current == O)).sum())
+        ties += int(full.sum())
+
+        finished = idx[done]
+        if game_log is not None:
+            histories[idx, plies[idx]] = moves
+            plies[idx] += 1
+            results = np.where(won, np.where(current == X, X_WINS, O_WINS), TIE)[done]
+            game_log.record_batch(histories[finished], results, "qtable", "qtable",
+                                  starters[finished])
+            histories[finished] = -1
+            plies[finished] = 0
+            starters[finished] = env.players[finished]
+
+        restart = finished[:max(0, num_episodes - started)]
+        started += len(restart)
+        env.reset(restart)
+        active[finished[len(restart):]] = False
+
+    elapsed = time.perf_counter() - start_time
+    stats = {
+        "episodes": x_wins + o_wins + ties,
+        "x_wins": x_wins,
+        "o_wins": o_wins,
+        "ties": ties,
+        "seconds": elapsed,
+    }
+    return q_table, stats
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    episodes = int(args[0]) if args else 1000000
+    canonical = "--canonical" in sys.argv
+    q_table, stats = train_headless(num_episodes=episodes, seed=0, canonical=canonical)
+    rate = stats["episodes"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"Trained {stats['episodes']} episodes in {stats['seconds']:.2f}s "
+          f"({rate:,.0f} episodes/s)")
+    print(f"X wins: {stats['x_wins']}  O wins: {stats['o_wins']}  Ties: {stats['ties']}")
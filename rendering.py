@@ -0,0 +1,209 @@
+import sys
+import time
+from board_core import WIN_LINES
+from profiling import profiler
+
+# pygame is imported when the first window opens, so importing the games
+# (for training, benchmarks or workers) never loads it
+pygame = None
+
+def load_pygame():
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+    return pygame
+
+# Constants (sizes are for the 3x3 board and scale down for larger ones)
+WIDTH, HEIGHT = 600, 600
+LINE_WIDTH = 15
+LINE_COLOR = (23, 145, 135)  # Color for grid lines
+CIRCLE_COLOR = (242, 85, 96)  # Color for 'O'
+X_COLOR = (0, 0, 255)  # Color for 'X'
+BG_COLOR = (28, 170, 156)  # Background color
+WIN_LINE_COLOR = (250, 0, 0)
+TEXT_COLOR = (0, 0, 0)
+CIRCLE_RADIUS = 60
+CIRCLE_WIDTH = 15
+X_WIDTH = 25
+X_OFFSET = 50
+FPS = 30  # Frame-rate cap; the loop sleeps between frames instead of spinning
+
+# Window, cached surfaces and dirty-rect redraws shared by all the games.
+# Callers only say what changed (cells, status text, winning line); render()
+# repaints just those areas and pushes them to the display. `size` is the
+# number of rows/columns of the board.
+class BoardRenderer:
+    def __init__(self, caption="Tic Tac Toe", fps=FPS, size=3):
+        load_pygame()
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption(caption)
+        self.font = pygame.font.Font(None, 40)
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.size = size
+        self.cell_width, self.cell_height = WIDTH // size, HEIGHT // size
+
+        self.background = self._render_background()
+        self.symbol_surfaces = {"X": self._render_x(), "O": self._render_o()}
+        self.cells = [None] * (size * size)  # 'X', 'O' or None, as last drawn
+        self.win_cells = None  # First and last cell of the winning line
+        self.texts = {}  # name -> (message, surface, position)
+        self.dirty = [self.screen.get_rect()]
+
+    # Scale a 3x3 size (offsets, radii, line widths) to this board
+    def _scale(self, length):
+        return max(1, length * 3 // self.size)
+
+    # Background with the grid lines, drawn once
+    def _render_background(self):
+        surface = pygame.Surface((WIDTH, HEIGHT))
+        surface.fill(BG_COLOR)
+        line_width = self._scale(LINE_WIDTH)
+        for i in range(1, self.size):
+            # Horizontal line
+            pygame.draw.line(surface, LINE_COLOR, (0, i * HEIGHT // self.size),
+                             (WIDTH, i * HEIGHT // self.size), line_width)
+            # Vertical line
+            pygame.draw.line(surface, LINE_COLOR, (i * WIDTH // self.size, 0),
+                             (i * WIDTH // self.size, HEIGHT), line_width)
+        return surface
+
+    def _render_x(self):
+        width, height = self.cell_width, self.cell_height
+        offset, line_width = self._scale(X_OFFSET), self._scale(X_WIDTH)
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.line(surface, X_COLOR, (offset, offset),
+                         (width - offset, height - offset), line_width)
+        pygame.draw.line(surface, X_COLOR, (width - offset, offset),
+                         (offset, height - offset), line_width)
+        return surface
+
+    def _render_o(self):
+        surface = pygame.Surface((self.cell_width, self.cell_height), pygame.SRCALPHA)
+        pygame.draw.circle(surface, CIRCLE_COLOR, (self.cell_width // 2, self.cell_height // 2),
+                           self._scale(CIRCLE_RADIUS), self._scale(CIRCLE_WIDTH))
+        return surface
+
+    def _cell_rect(self, cell):
+        row, col = divmod(cell, self.size)
+        return pygame.Rect(col * self.cell_width, row * self.cell_height,
+                           self.cell_width, self.cell_height)
+
+    # Take the symbols from a list-of-lists board; only cells whose symbol
+    # changed since the last call get repainted
+    def set_board(self, board, x_symbol="X", o_symbol="O"):
+        for cell in range(self.size * self.size):
+            value = board[cell // self.size][cell % self.size]
+            symbol = "X" if value == x_symbol else "O" if value == o_symbol else None
+            if symbol != self.cells[cell]:
+                self.cells[cell] = symbol
+                self.dirty.append(self._cell_rect(cell))
+
+    # Take the symbols from a pair of bitmasks (bit c set = cell c taken)
+    def set_masks(self, x_mask, o_mask):
+        for cell in range(self.size * self.size):
+            symbol = "X" if x_mask >> cell & 1 else "O" if o_mask >> cell & 1 else None
+            if symbol != self.cells[cell]:
+                self.cells[cell] = symbol
+                self.dirty.append(self._cell_rect(cell))
+
+    # Line through a winning row/column/diagonal of the 3x3 board (index
+    # into WIN_LINES), -1 for none
+    def set_win_line(self, line):
+        self.set_win_cells(None if line < 0 else (WIN_LINES[line][0], WIN_LINES[line][-1]))
+
+    # Line from the first to the last cell of a winning line, None for none
+    def set_win_cells(self, cells):
+        if cells != self.win_cells:
+            self.win_cells = cells
+            self.dirty.append(self.screen.get_rect())
+
+    def _set_text(self, name, message, top):
+        old = self.texts.get(name)
+        if old is not None and old[0] == message:
+            return
+        surface = self.font.render(message, True, TEXT_COLOR)
+        rect = surface.get_rect(midtop=(WIDTH // 2, top))
+        self.texts[name] = (message, surface, rect)
+        self.dirty.append(rect if old is None else rect.union(old[2]))
+
+    # Status message at the bottom of the window
+    def set_status(self, message):
+        self._set_text("status", message, HEIGHT - 50)
+
+    # Score line at the top of the window
+    def set_score(self, message):
+        self._set_text("score", message, 10)
+
+    # Runs through the centers of the end cells and on to their outer edges
+    def _draw_win_line(self):
+        start = self._cell_rect(self.win_cells[0]).center
+        end = self._cell_rect(self.win_cells[1]).center
+        row_step = (end[1] > start[1]) - (end[1] < start[1])
+        col_step = (end[0] > start[0]) - (end[0] < start[0])
+        half_width, half_height = self.cell_width // 2, self.cell_height // 2
+        start = (start[0] - col_step * half_width, start[1] - row_step * half_height)
+        end = (end[0] + col_step * half_width, end[1] + row_step * half_height)
+        pygame.draw.line(self.screen, WIN_LINE_COLOR, start, end, self._scale(10))
+
+    # Repaint the dirty areas (clipped, so everything else is skipped cheaply)
+    # and update only those parts of the display
+    def render(self):
+        if not self.dirty:
+            return
+        with profiler.phase("draw"):
+            for rect in self.dirty:
+                self.screen.set_clip(rect)
+                self.screen.blit(self.background, rect, rect)
+                for cell, symbol in enumerate(self.cells):
+                    if symbol is not None:
+                        self.screen.blit(self.symbol_surfaces[symbol], self._cell_rect(cell))
+                if self.win_cells is not None:
+                    self._draw_win_line()
+                for _, surface, text_rect in self.texts.values():
+                    self.screen.blit(surface, text_rect)
+            self.screen.set_clip(None)
+        with profiler.phase("flip"):
+            pygame.display.update(self.dirty)
+        profiler.count("dirty_rects", len(self.dirty))
+        self.dirty = []
+
+    # Handle window events; returns the events other than QUIT
+    def handle_events(self):
+        events = []
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            events.append(event)
+        return events
+
+    # Wait for the next frame (the idle time shows up as "frame_wait")
+    def tick(self):
+        with profiler.phase("frame_wait"):
+            self.clock.tick(self.fps)
+        profiler.count("frames")
+        profiler.maybe_report()
+
+# Non-blocking replacement for time.sleep() between moves: ready() turns
+# true once `delay` milliseconds have passed since the last move
+class MoveTimer:
+    def __init__(self, delay):
+        self.delay = delay
+        self.last = _ticks()
+
+    def ready(self):
+        now = _ticks()
+        if now - self.last >= self.delay:
+            self.last = now
+            return True
+        return False
+
+    def restart(self):
+        self.last = _ticks()
+
+# Milliseconds on a monotonic clock (pygame.time.get_ticks() needs pygame)
+def _ticks():
+    return time.monotonic() * 1000
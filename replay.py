@@ -0,0 +1,176 @@
+import sys
+import time
+import numpy as np
+from board_core import X, O
+from q_training import ALPHA, GAMMA, EPSILON, table_index, choose_moves, initialize_q_table
+from q_storage import DenseQStore
+from vec_env import VecTicTacToeEnv
+
+CAPACITY = 100000  # Transitions kept; the oldest are overwritten first
+BATCH_SIZE = 256
+PRIORITY_EXPONENT = 0.6  # 0 = uniform sampling, 1 = fully proportional to |TD error|
+PRIORITY_OFFSET = 1e-3  # Keeps transitions with zero TD error sampleable
+
+# Ring buffer of (state, action, reward, next_state, done) transitions, one
+# preallocated NumPy column each. States are state numbers (3**9 fits in
+# uint16), actions are cells 0-8 and rewards are for the player who moved.
+# New transitions get the highest priority seen so far, so each one is
+# replayed at least once in prioritized sampling.
+class ReplayBuffer:
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.uint16)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.uint16)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.priorities = np.zeros(capacity, dtype=np.float32)
+        self.max_priority = 1.0
+        self.position = 0  # Next slot to write
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    # Append one transition or arrays of them
+    def add(self, states, actions, rewards, next_states, dones):
+        states = np.atleast_1d(states)[-self.capacity:]
+        count = len(states)
+        if count == 0:
+            return
+        slots = (self.position + np.arange(count)) % self.capacity
+        self.states[slots] = states
+        self.actions[slots] = np.atleast_1d(actions)[-count:]
+        self.rewards[slots] = np.atleast_1d(rewards)[-count:]
+        self.next_states[slots] = np.atleast_1d(next_states)[-count:]
+        self.dones[slots] = np.atleast_1d(dones)[-count:]
+        self.priorities[slots] = self.max_priority
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    # Indices of a minibatch and the importance-sampling weight of each one
+    # (all 1 for uniform sampling; `beta` scales the prioritized correction)
+    def sample(self, batch_size, rng, prioritized=False, beta=0.4):
+        if not prioritized:
+            return rng.integers(self.size, size=batch_size), np.ones(batch_size, dtype=np.float32)
+        cumulative = np.cumsum(self.priorities[:self.size] ** PRIORITY_EXPONENT, dtype=np.float64)
+        total = cumulative[-1]
+        indices = np.searchsorted(cumulative, rng.random(batch_size) * total, side="right")
+        indices = np.minimum(indices, self.size - 1)
+        probabilities = (self.priorities[indices] ** PRIORITY_EXPONENT) / total
+        weights = (self.size * probabilities) ** -beta
+        return indices, (weights / weights.max()).astype(np.float32)
+
+    def update_priorities(self, indices, td_errors):
+        priorities = np.abs(td_errors) + PRIORITY_OFFSET
+        self.priorities[indices] = priorities
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+
+# One minibatch Q-learning step on a Q-store (q_storage.py), applied with
+# one scatter-add. Q-values are for the player to move, like the greedy
+# max that ai_move() and bench.QTableAgent play for either side, so the
+# target is the reward minus the opponent's best value in the next state.
+# Early positions show up many times in a minibatch, so the steps of each
+# (state, action) pair are averaged rather than summed, which would
+# overshoot. Returns the TD errors, e.g. for update_priorities().
+def replay_update(store, buffer, indices, weights, alpha=ALPHA, gamma=GAMMA, canonical=False):
+    rows, columns = table_index(buffer.states[indices].astype(np.int64), canonical)
+    actions = columns[np.arange(len(indices)), buffer.actions[indices]]
+    next_rows = table_index(buffer.next_states[indices].astype(np.int64), canonical)[0]
+    future = np.where(buffer.dones[indices], 0.0, -store.max_values(next_rows))
+    td_errors = buffer.rewards[indices] + gamma * future - store.gather(rows, actions)
+    _, pairs, repeats = np.unique(rows * 9 + actions, return_inverse=True, return_counts=True)
+    steps = alpha * weights * td_errors / repeats[pairs]
+    store.scatter_add(rows, actions, steps.astype(np.float32))
+    return td_errors
+
+# Self-play `num_games` games with the table's epsilon-greedy policy on a
+# batch of boards and log every move into the buffer, without learning.
+# When a game is won, the loser's last move is also logged as a terminal
+# transition with reward -1, so that move gets the blame directly.
+def collect_self_play(buffer, q_table, num_games, rng, epsilon=EPSILON, canonical=False,
+                      num_boards=256):
+    num_boards = max(1, min(num_boards, num_games))
+    env = VecTicTacToeEnv(num_boards, auto_reset=False)
+    active = np.ones(num_boards, dtype=bool)
+    previous_states = np.zeros(num_boards, dtype=np.int64)  # Other player's last move
+    previous_moves = np.zeros(num_boards, dtype=np.int64)
+    started = num_boards
+    results = {"x_wins": 0, "o_wins": 0, "ties": 0}
+
+    while active.any():
+        idx = np.flatnonzero(active)
+        states = env.states[idx].copy()
+        rows, columns = table_index(states, canonical)
+        q_values = np.take_along_axis(q_table[rows], columns, axis=1)
+        moves = choose_moves(q_values, env.boards[idx], epsilon, rng)
+        _, rewards, done, info = env.step(moves, idx)
+        current, new_states = info["players"], info["states"]
+        won = rewards > 0
+        losers = idx[won]
+
+        buffer.add(states, moves, rewards, new_states, done)
+        buffer.add(previous_states[losers], previous_moves[losers], -np.ones(len(losers)),
+                   new_states[won], np.ones(len(losers), dtype=bool))
+        previous_states[idx] = states
+        previous_moves[idx] = moves
+
+        results["x_wins"] += int((won & (current == X)).sum())
+        results["o_wins"] += int((won & (current == O)).sum())
+        results["ties"] += int((done & ~won).sum())
+
+        finished = idx[done]
+        restart = finished[:max(0, num_games - started)]
+        started += len(restart)
+        env.reset(restart)
+        active[finished[len(restart):]] = False
+    return results
+
+# Alternate between logging `games_per_round` self-play games and replaying
+# `updates_per_round` minibatches from the buffer, so every game is learned
+# from many times. Returns the table and totals like train_headless(). The
+# values are for the player to move rather than train_headless()'s O's
+# point of view, so don't mix the two in one table.
+def train_replay(q_table=None, num_episodes=20000, games_per_round=256, updates_per_round=64,
+                 batch_size=BATCH_SIZE, capacity=CAPACITY, prioritized=False,
+                 alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON, seed=None, canonical=False):
+    if q_table is None:
+        q_table = initialize_q_table(canonical)
+    rng = np.random.default_rng(seed)
+    store = DenseQStore(q_table)
+    buffer = ReplayBuffer(capacity)
+    stats = {"episodes": 0, "x_wins": 0, "o_wins": 0, "ties": 0, "updates": 0}
+    start_time = time.perf_counter()
+
+    while stats["episodes"] < num_episodes:
+        games = min(games_per_round, num_episodes - stats["episodes"])
+        results = collect_self_play(buffer, q_table, games, rng, epsilon, canonical)
+        for key, value in results.items():
+            stats[key] += value
+        stats["episodes"] += games
+
+        for _ in range(updates_per_round):
+            indices, weights = buffer.sample(batch_size, rng, prioritized)
+            td_errors = replay_update(store, buffer, indices, weights, alpha, gamma, canonical)
+            if prioritized:
+                buffer.update_priorities(indices, td_errors)
+        stats["updates"] += updates_per_round
+
+    stats["seconds"] = time.perf_counter() - start_time
+    return q_table, stats
+
+if __name__ == "__main__":
+    from q_training import train_headless
+    from solver import score_q_policy
+
+    episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    runs = [("inline TD", lambda: train_headless(num_episodes=episodes, seed=0, canonical=True)),
+            ("replay", lambda: train_replay(num_episodes=episodes, seed=0, canonical=True)),
+            ("prioritized", lambda: train_replay(num_episodes=episodes, seed=0, canonical=True,
+                                                 prioritized=True))]
+    print(f"{episodes} self-play games each:")
+    for name, train in runs:
+        q_table, stats = train()
+        score = score_q_policy(q_table, canonical=True)
+        print(f"{name:>12}: optimal in {score['optimal']:.1%} of positions, "
+              f"mean value loss {score['value_loss']:.2f} ({stats['seconds']:.2f}s)")
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Exploration-rate and learning-rate schedules for the trainers. value()
+# takes the number of episodes trained so far and, for schedules with
+# needs_visits set, an array of visit counts (of the states for epsilon, of
+# the (state, action) pairs for alpha), and returns a float or an array of
+# one value per count. A plain number can be passed wherever a schedule is
+# expected; as_schedule() wraps it.
+class ConstantSchedule:
+    needs_visits = False
+
+    def __init__(self, value):
+        self.constant = value
+
+    def value(self, episode, visits=None):
+        return self.constant
+
+    def __repr__(self):
+        return f"ConstantSchedule({self.constant})"
+
+# From `start` down to `end` in a straight line over `episodes`, then `end`
+class LinearSchedule:
+    needs_visits = False
+
+    def __init__(self, start, end, episodes):
+        self.start = start
+        self.end = end
+        self.episodes = episodes
+
+    def value(self, episode, visits=None):
+        progress = min(1.0, episode / self.episodes)
+        return self.start + (self.end - self.start) * progress
+
+    def __repr__(self):
+        return f"LinearSchedule({self.start}, {self.end}, {self.episodes})"
+
+# Halves the distance from `start` to `end` every `half_life` episodes
+class ExponentialSchedule:
+    needs_visits = False
+
+    def __init__(self, start, end, half_life):
+        self.start = start
+        self.end = end
+        self.half_life = half_life
+
+    def value(self, episode, visits=None):
+        return self.end + (self.start - self.end) * 0.5 ** (episode / self.half_life)
+
+    def __repr__(self):
+        return f"ExponentialSchedule({self.start}, {self.end}, {self.half_life})"
+
+# Decays with the visit count instead of time: start at 0 visits, halfway
+# to `end` after `scale` visits, so rare states keep exploring (and rare
+# pairs keep learning fast) while common ones settle down
+class VisitSchedule:
+    needs_visits = True
+
+    def __init__(self, start, end, scale):
+        self.start = start
+        self.end = end
+        self.scale = scale
+
+    def value(self, episode, visits=None):
+        if visits is None:
+            return self.start
+        return self.end + (self.start - self.end) * self.scale / (self.scale + np.asarray(visits))
+
+    def __repr__(self):
+        return f"VisitSchedule({self.start}, {self.end}, {self.scale})"
+
+SCHEDULES = {"constant": ConstantSchedule, "linear": LinearSchedule,
+             "exponential": ExponentialSchedule, "visits": VisitSchedule}
+
+def as_schedule(value):
+    return value if hasattr(value, "value") else ConstantSchedule(value)
+
+# Build a schedule by name; `length` is the episodes of "linear", the half
+# life of "exponential" and the visit scale of "visits"
+def make_schedule(kind, start, end=None, length=None):
+    if kind not in SCHEDULES:
+        raise ValueError(f"Unknown schedule {kind!r}, expected one of {tuple(SCHEDULES)}")
+    if kind == "constant":
+        return ConstantSchedule(start)
+    if end is None or length is None:
+        raise ValueError(f"A {kind} schedule needs an end value and a length")
+    return SCHEDULES[kind](start, end, length)
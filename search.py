@@ -0,0 +1,139 @@
+import time
+from board_core import (X, FULL_MASK, NUM_STATES, IS_WIN, CELLS_BY_MASK, MOVE_DELTAS,
+                        masks_to_state)
+from symmetry import canonicalize, to_canonical_action, from_canonical_action
+from profiling import profiler
+
+# Score of a win; the number of empty cells left is added on top so that
+# faster wins score higher (and slower losses score less badly)
+WIN_SCORE = 10
+INFINITY = 1000
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Try the center first, then corners, then edges: good moves early means
+# more alpha-beta cutoffs
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+ORDERED_MOVES = tuple(tuple(cell for cell in MOVE_ORDER if free >> cell & 1)
+                      for free in range(1 << 9))
+
+# Negamax search with alpha-beta pruning and a transposition table keyed on
+# the canonical state number (same base-3 encoding as state_to_number, see
+# symmetry.py), so the 8 symmetric copies of a position share one entry.
+# Keep one instance around: the table is reused across moves and games.
+class MinimaxSearch:
+    def __init__(self):
+        self.table = {}
+        self.best_moves = {}
+        self.nodes = 0
+        self.probes = 0
+        self.hits = 0
+
+    # Both players can start a game, so the side to move is part of the key
+    @staticmethod
+    def _key(state, side):
+        state = canonicalize(state)[0]
+        return state if side == X else state + NUM_STATES
+
+    # Score of the position for `side` (the player to move)
+    def score(self, x_mask, o_mask, side, state=None):
+        if state is None:
+            state = masks_to_state(x_mask, o_mask)
+        me, them = (x_mask, o_mask) if side == X else (o_mask, x_mask)
+        return self._negamax(me, them, state, side, -INFINITY, INFINITY)
+
+    def _negamax(self, me, them, state, side, alpha, beta):
+        self.nodes += 1
+        occupied = me | them
+        free = FULL_MASK ^ occupied
+        if IS_WIN[them]:
+            return -(WIN_SCORE + len(CELLS_BY_MASK[free]))
+        if occupied == FULL_MASK:
+            return 0
+
+        key = self._key(state, side)
+        self.probes += 1
+        entry = self.table.get(key)
+        if entry is not None:
+            self.hits += 1
+            flag, value = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        alpha_orig = alpha
+        best = -INFINITY
+        deltas = MOVE_DELTAS[side]
+        for cell in ORDERED_MOVES[free]:
+            value = -self._negamax(them, me | 1 << cell, state + deltas[cell],
+                                   3 - side, -beta, -alpha)
+            if value > best:
+                best = value
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            self.table[key] = (UPPER, best)
+        elif best >= beta:
+            self.table[key] = (LOWER, best)
+        else:
+            self.table[key] = (EXACT, best)
+        return best
+
+    # Best cell (0-8) for `side`, or -1 if the game is already over
+    def best_move(self, x_mask, o_mask, side):
+        state = masks_to_state(x_mask, o_mask)
+        key = self._key(state, side)
+        transform = canonicalize(state)[1]
+        move = self.best_moves.get(key)
+        if move is not None:
+            self.probes += 1
+            self.hits += 1
+            return from_canonical_action(move, transform) if move >= 0 else move
+
+        move = -1
+        start_nodes = self.nodes
+        if not (IS_WIN[x_mask] or IS_WIN[o_mask]):
+            me, them = (x_mask, o_mask) if side == X else (o_mask, x_mask)
+            best = alpha = -INFINITY
+            deltas = MOVE_DELTAS[side]
+            for cell in ORDERED_MOVES[FULL_MASK ^ (me | them)]:
+                value = -self._negamax(them, me | 1 << cell, state + deltas[cell],
+                                       3 - side, -INFINITY, -alpha)
+                if value > best:
+                    best, move = value, cell
+                    alpha = max(alpha, best)
+        self.best_moves[key] = to_canonical_action(move, transform) if move >= 0 else move
+        profiler.count("search_nodes", self.nodes - start_nodes)
+        return move
+
+    def stats(self):
+        return {
+            "nodes": self.nodes,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "table_size": len(self.table),
+        }
+
+    def reset_stats(self):
+        self.nodes = self.probes = self.hits = 0
+
+if __name__ == "__main__":
+    engine = MinimaxSearch()
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        move = engine.best_move(0, 0, X)
+        elapsed = time.perf_counter() - start
+        stats = engine.stats()
+        print(f"{label}: move {move} in {elapsed * 1e6:.1f} us, {stats['nodes']} nodes, "
+              f"{stats['hit_rate']:.1%} table hits, {stats['table_size']} entries")
+        engine.reset_stats()
@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import struct
+import numpy as np
+from q_training import ALPHA, GAMMA, EPSILON, initialize_q_table, train_headless
+
+# Snapshot layout: MAGIC, a little-endian uint32 header length, a JSON
+# header (hyperparameters, symbols, episode count, table shape), padding up
+# to a multiple of DATA_ALIGNMENT, then the raw float32 Q-values row by row.
+MAGIC = b"TTTQ"
+VERSION = 1
+DATA_ALIGNMENT = 64
+SYMBOLS = (" ", "X", "O")  # Cell value 0, 1, 2 in the state numbers
+
+# Write the table to `path` (through a temporary file, so an interrupted
+# save never leaves a half-written snapshot behind)
+def save_q_table(path, q_table, episodes=0, alpha=ALPHA, gamma=GAMMA,
+                 epsilon=EPSILON, canonical=None, **extra):
+    if canonical is None:
+        canonical = q_table.shape[0] != 3 ** 9
+    header = {
+        "version": VERSION,
+        "shape": list(q_table.shape),
+        "dtype": "float32",
+        "alpha": alpha,
+        "gamma": gamma,
+        "epsilon": epsilon,
+        "symbols": list(SYMBOLS),
+        "canonical": canonical,
+        "episodes": episodes,
+    }
+    header.update(extra)
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix_size = len(MAGIC) + 4 + len(header_bytes)
+    padding = -prefix_size % DATA_ALIGNMENT
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes) + padding))
+        f.write(header_bytes)
+        f.write(b" " * padding)
+        f.write(np.ascontiguousarray(q_table, dtype=np.float32).tobytes())
+    os.replace(tmp_path, path)
+
+# Read just the header of a snapshot, plus the offset where the data starts
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a Q-table snapshot")
+        (header_size,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_size).decode("utf-8"))
+    if header.get("version") != VERSION:
+        raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+    return header, len(MAGIC) + 4 + header_size
+
+# Map a snapshot into memory without reading it. The default read-only mode
+# lets many processes share one copy in the page cache; use mode="c" for a
+# private copy-on-write table that can keep learning.
+def load_q_table(path, mode="r"):
+    header, offset = read_header(path)
+    q_table = np.memmap(path, dtype=np.float32, mode=mode, offset=offset,
+                        shape=tuple(header["shape"]))
+    return q_table, header
+
+# Headless training that saves a snapshot every `checkpoint_every` episodes,
+# so a long run can be stopped and resumed from its latest checkpoint. Each
+# chunk gets the next child of SeedSequence(seed); the number spawned so far
+# is kept in the header, so a resumed run continues the same seed stream
+# instead of replaying the first chunks' games.
+def train_with_checkpoints(path, num_episodes, checkpoint_every=100000, q_table=None,
+                           alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON, seed=None,
+                           canonical=False, resume=True):
+    episodes = 0
+    chunks = 0
+    if q_table is None:
+        if resume and os.path.exists(path):
+            snapshot, header = load_q_table(path)
+            if header["canonical"] != canonical:
+                raise ValueError(f"{path} holds a {'canonical' if header['canonical'] else 'full'} "
+                                 f"table, but canonical={canonical} was asked for")
+            q_table = np.array(snapshot)
+            episodes = header["episodes"]
+            # Snapshots from before the count was saved: every chunk but the
+            # last was checkpoint_every episodes
+            chunks = header.get("seed_chunks", -(-episodes // checkpoint_every))
+        else:
+            q_table = initialize_q_table(canonical)
+
+    seeds = np.random.SeedSequence(seed)
+    seeds.spawn(chunks)
+    while episodes < num_episodes:
+        chunk = min(checkpoint_every, num_episodes - episodes)
+        _, stats = train_headless(q_table, num_episodes=chunk, alpha=alpha, gamma=gamma,
+                                  epsilon=epsilon, seed=seeds.spawn(1)[0],
+                                  canonical=canonical)
+        episodes += stats["episodes"]
+        save_q_table(path, q_table, episodes=episodes, alpha=alpha, gamma=gamma,
+                     epsilon=epsilon, canonical=canonical, seed_chunks=seeds.n_children_spawned)
+        print(f"Checkpoint: {episodes}/{num_episodes} episodes saved to {path}")
+    return q_table, episodes
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "q_table.bin"
+    episodes = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    train_with_checkpoints(path, episodes, seed=0, canonical=True)
@@ -0,0 +1,197 @@
+import os
+import sys
+import numpy as np
+from board_core import (X, O, EMPTY, NUM_STATES, ONGOING, TIE, STATE_CELLS, STATE_OUTCOMES,
+                        PLACE_VALUES, CELLS_BY_MASK)
+from search import WIN_SCORE, MOVE_ORDER
+from q_training import table_index
+from snapshots import load_q_table
+from transitions import NEXT_STATE
+
+# Perfect-play table for every state number and side to move, solved once
+# bottom-up (positions with fewer empty cells first) and saved as a small
+# binary asset. Scores use the same scale as search.py: a win is worth
+# WIN_SCORE plus the empty cells left, so faster wins score higher.
+PERFECT_PLAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfect_play.bin")
+MAGIC = b"TTTS"
+# Tag, values (int8), optimal-move masks (uint16), reachability flags
+FILE_SIZE = len(MAGIC) + 2 * NUM_STATES + 2 * NUM_STATES * 2 + NUM_STATES
+
+# Reachability flags: reached in games where X moves first / where O does
+REACHED_X_FIRST, REACHED_O_FIRST = 1, 2
+
+_BITS = 1 << np.arange(9)
+_DELTAS = np.array(PLACE_VALUES)
+
+# Returns (values, optimal, reachable):
+#   values[side - 1, state]  int8 score for the side to move
+#   optimal[side - 1, state] uint16 mask of the cells that reach that score
+#   reachable[state]         REACHED_X_FIRST | REACHED_O_FIRST flags
+def solve():
+    empties = (STATE_CELLS == EMPTY).sum(axis=1)
+    legal = STATE_CELLS == EMPTY
+    values = np.zeros((2, NUM_STATES), dtype=np.int8)
+    optimal = np.zeros((2, NUM_STATES), dtype=np.uint16)
+
+    for layer in range(10):
+        states = np.flatnonzero(empties == layer)
+        outcomes = STATE_OUTCOMES[states]
+        playing = outcomes == ONGOING
+        open_states = states[playing]
+        open_legal = legal[open_states]
+        for side in (X, O):
+            layer_values = np.zeros(len(states), dtype=np.int16)
+            decided = (outcomes != ONGOING) & (outcomes != TIE)
+            won = decided & (outcomes == side)
+            layer_values[decided] = -(WIN_SCORE + layer)
+            layer_values[won] = WIN_SCORE + layer
+
+            children = np.where(open_legal, open_states[:, None] + side * _DELTAS, 0)
+            child_values = np.where(open_legal, -values[2 - side][children].astype(np.int16), -1000)
+            best = child_values.max(axis=1)
+            layer_values[playing] = best
+            optimal[side - 1, open_states] = ((child_values == best[:, None]) * _BITS).sum(axis=1)
+            values[side - 1, states] = layer_values
+
+    return values, optimal, find_reachable()
+
+# Mark the states reached by legal play from the empty board
+def find_reachable():
+    reachable = np.zeros(NUM_STATES, dtype=np.uint8)
+    for first, flag in ((X, REACHED_X_FIRST), (O, REACHED_O_FIRST)):
+        frontier = np.array([0])
+        side = first
+        while len(frontier):
+            reachable[frontier] |= flag
+            children = NEXT_STATE[side - 1, frontier]
+            frontier = np.unique(children[children >= 0])
+            side = X + O - side
+    return reachable
+
+# Written to a per-process temporary file and then renamed, as in
+# transitions.py, so a reader never sees a half-written table
+def save_tables(path, values, optimal, reachable):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(values.tobytes())
+        f.write(optimal.astype("<u2").tobytes())
+        f.write(reachable.tobytes())
+    os.replace(tmp_path, path)
+
+def load_tables(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a perfect-play table")
+    if len(data) != FILE_SIZE:
+        raise ValueError(f"{path} is {len(data)} bytes, expected {FILE_SIZE}")
+    offset = len(MAGIC)
+    values = np.frombuffer(data, dtype=np.int8, count=2 * NUM_STATES, offset=offset)
+    offset += values.nbytes
+    optimal = np.frombuffer(data, dtype="<u2", count=2 * NUM_STATES, offset=offset)
+    offset += optimal.nbytes
+    reachable = np.frombuffer(data, dtype=np.uint8, count=NUM_STATES, offset=offset)
+    return values.reshape(2, NUM_STATES), optimal.reshape(2, NUM_STATES), reachable
+
+# Tables from the shipped asset, solving (and saving) them if it is missing
+# or unreadable. An asset that can't be written (e.g. a read-only install)
+# only means the next run solves them again.
+def load_or_solve(path=PERFECT_PLAY_FILE):
+    if os.path.exists(path):
+        try:
+            return load_tables(path)
+        except ValueError:
+            pass
+    tables = solve()
+    try:
+        save_tables(path, *tables)
+    except OSError:
+        try:
+            os.remove(f"{path}.{os.getpid()}.tmp")
+        except OSError:
+            pass
+    return tables
+
+_values = _optimal = None
+
+def _ensure_loaded():
+    global _values, _optimal
+    if _values is None:
+        values, optimal, _ = load_or_solve()
+        _values, _optimal = values.tolist(), optimal.tolist()
+
+# Score of `state` for `side` (X or O) to move under perfect play
+def position_value(state, side):
+    _ensure_loaded()
+    return _values[side - 1][state]
+
+# All optimal cells for `side` in `state`
+def optimal_moves(state, side):
+    _ensure_loaded()
+    return CELLS_BY_MASK[_optimal[side - 1][state]]
+
+# One optimal cell (center, then corners, then edges), -1 if the game is over
+def best_move(state, side):
+    _ensure_loaded()
+    mask = _optimal[side - 1][state]
+    for cell in MOVE_ORDER:
+        if mask >> cell & 1:
+            return cell
+    return -1
+
+# Compare a Q-table's greedy policy with perfect play over every reachable
+# position that is still being played. "optimal" is the share of positions
+# where every best-Q move is optimal, "value_loss" the mean score given up.
+def score_q_policy(q_table, canonical=None):
+    if canonical is None:
+        canonical = q_table.shape[0] != NUM_STATES
+    values, optimal, reachable = load_or_solve()
+    x_count = (STATE_CELLS == X).sum(axis=1)
+    o_count = (STATE_CELLS == O).sum(axis=1)
+
+    positions = 0
+    all_optimal = 0
+    value_loss = 0.0
+    for first, flag in ((X, REACHED_X_FIRST), (O, REACHED_O_FIRST)):
+        states = np.flatnonzero(((reachable & flag) != 0) & (STATE_OUTCOMES == ONGOING))
+        # The starting player moves whenever both have played equally often
+        movers = np.where(x_count[states] == o_count[states], first, X + O - first)
+
+        rows, columns = table_index(states, canonical)
+        q_values = np.take_along_axis(q_table[rows], columns, axis=1)
+        legal = STATE_CELLS[states] == EMPTY
+        q_values = np.where(legal, q_values, -np.inf)
+        greedy = legal & (q_values == q_values.max(axis=1, keepdims=True))
+        greedy_mask = (greedy * _BITS).sum(axis=1)
+        best_mask = optimal[movers - 1, states].astype(np.int64)
+        all_optimal += int(((greedy_mask & ~best_mask) == 0).sum())
+
+        children = np.where(legal, states[:, None] + movers[:, None] * _DELTAS, 0)
+        child_values = -values[2 - movers[:, None], children].astype(np.float64)
+        greedy_value = np.where(greedy, child_values, 0).sum(axis=1) / greedy.sum(axis=1)
+        value_loss += float((values[movers - 1, states] - greedy_value).sum())
+        positions += len(states)
+
+    return {"positions": positions,
+            "optimal": all_optimal / positions,
+            "value_loss": value_loss / positions}
+
+# Solve every position, save the table and, given a Q-table snapshot path,
+# score its greedy policy
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    values, optimal, reachable = solve()
+    save_tables(PERFECT_PLAY_FILE, values, optimal, reachable)
+    print(f"Solved {NUM_STATES} states; {int((reachable & REACHED_X_FIRST).astype(bool).sum())} "
+          f"reachable when X starts, "
+          f"{int(reachable.astype(bool).sum())} when either player starts")
+    print(f"Value of the empty board for X: {values[0, 0]}")
+    if argv:
+        q_table, _ = load_q_table(argv[0])
+        score = score_q_policy(q_table)
+        print(f"Q-table greedy policy: optimal in {score['optimal']:.1%} of "
+              f"{score['positions']} positions, mean value loss {score['value_loss']:.2f}")
+
+if __name__ == "__main__":
+    main()
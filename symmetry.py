@@ -0,0 +1,61 @@
+import numpy as np
+from board_core import STATE_CELLS
+
+# The 8 symmetries of the board (the dihedral group D4). Each transform is a
+# permutation of cells: cell c of a board moves to cell TRANSFORMS[t][c].
+def _rotate(cell):
+    row, col = divmod(cell, 3)
+    return col * 3 + (2 - row)
+
+def _mirror(cell):
+    row, col = divmod(cell, 3)
+    return row * 3 + (2 - col)
+
+def _build_transforms():
+    transforms = []
+    perm = tuple(range(9))
+    for _ in range(4):
+        transforms.append(perm)
+        transforms.append(tuple(_mirror(cell) for cell in perm))
+        perm = tuple(_rotate(cell) for cell in perm)
+    return tuple(transforms)
+
+TRANSFORMS = _build_transforms()
+# INVERSE_TRANSFORMS[t] undoes TRANSFORMS[t]
+INVERSE_TRANSFORMS = tuple(tuple(perm.index(cell) for cell in range(9)) for perm in TRANSFORMS)
+TRANSFORM_ARRAY = np.array(TRANSFORMS, dtype=np.int64)
+
+# For every state number: the smallest state number among its 8 images (the
+# canonical representative) and the transform that produces it
+def _compute_canonical():
+    digits = STATE_CELLS.astype(np.int32)
+    images = np.stack([digits @ (3 ** TRANSFORM_ARRAY[t]).astype(np.int32)
+                       for t in range(len(TRANSFORMS))])
+    transform = images.argmin(axis=0)
+    return images.min(axis=0), transform.astype(np.int8)
+
+CANONICAL_STATES, CANONICAL_TRANSFORMS = _compute_canonical()
+
+# Compact row numbers so a table only needs one row per canonical state
+_representatives, CANONICAL_ROWS = np.unique(CANONICAL_STATES, return_inverse=True)
+NUM_CANONICAL_STATES = len(_representatives)
+
+_canonical_states = CANONICAL_STATES.tolist()
+_canonical_transforms = CANONICAL_TRANSFORMS.tolist()
+_canonical_rows = CANONICAL_ROWS.tolist()
+
+# Canonical state number and the transform that maps `state` onto it
+def canonicalize(state):
+    return _canonical_states[state], _canonical_transforms[state]
+
+# Row of `state` in a table indexed by canonical state, plus its transform
+def canonical_row(state):
+    return _canonical_rows[state], _canonical_transforms[state]
+
+# Map a cell/action of the original board onto the canonical board
+def to_canonical_action(action, transform):
+    return TRANSFORMS[transform][action]
+
+# Map a cell/action of the canonical board back onto the original board
+def from_canonical_action(action, transform):
+    return INVERSE_TRANSFORMS[transform][action]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from board_core import X, O, X_WINS, O_WINS, TIE
+from game_log import (RECORD_DTYPE, HEADER, NO_MOVE, GameLogWriter, pack_moves, unpack_moves,
+                      read_games, agent_id)
+
+def test_records_are_16_bytes():
+    assert RECORD_DTYPE.itemsize == 16
+    assert HEADER.size == 16
+
+# Every length from an empty game to a full board survives packing, with
+# -1 after the last move
+def test_moves_round_trip():
+    rng = np.random.default_rng(0)
+    moves = np.full((10, 9), -1, dtype=np.int8)
+    for length in range(10):
+        moves[length, :length] = rng.permutation(9)[:length]
+    packed = pack_moves(moves)
+    assert packed.dtype == np.uint64
+    assert (unpack_moves(packed) == moves).all()
+
+def test_move_nibbles():
+    moves = np.array([[4, 0, 8, -1, -1, -1, -1, -1, -1]])
+    nibbles = [int(pack_moves(moves)[0]) >> (4 * i) & 0xF for i in range(9)]
+    assert nibbles == [4, 0, 8] + [NO_MOVE] * 6
+
+def test_writer_and_reader(tmp_path):
+    path = tmp_path / "games.log"
+    games = [([4, 0, 8, 2, 1, 7, 6, 3, 5], TIE, X), ([0, 3, 1, 4, 2], X_WINS, X),
+             ([4, 0, 1, 2, 7], O_WINS, O)]
+    with GameLogWriter(str(path), buffer_records=2) as writer:
+        for moves, result, first in games:
+            writer.record(moves, result, "qtable", "minimax", first)
+    assert path.stat().st_size == HEADER.size + 16 * len(games)
+
+    records = read_games(str(path))
+    assert len(records) == len(games)
+    cells = unpack_moves(records["moves"])
+    for record, row, (moves, result, first) in zip(records, cells, games):
+        assert row[:len(moves)].tolist() == moves
+        assert (row[len(moves):] == -1).all()
+        assert (record["result"], record["first"]) == (result, first)
+        assert (record["x_agent"], record["o_agent"]) == (agent_id("qtable"), agent_id("minimax"))
+
+# Appending keeps the earlier records; another file type is refused
+def test_append_and_refuse_foreign_files(tmp_path):
+    path = str(tmp_path / "games.log")
+    for _ in range(2):
+        with GameLogWriter(path) as writer:
+            writer.record([0, 1], TIE)
+    assert len(read_games(path)) == 2
+
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"TTTQ" + bytes(12))
+    with pytest.raises(ValueError):
+        GameLogWriter(str(other))
@@ -0,0 +1,52 @@
+import json
+import asyncio
+from q_training import initialize_q_table
+from game_server import GameServer, LINE_LIMIT
+
+# Send each line on one connection and collect the replies
+async def exchange(lines):
+    server = GameServer(q_table=initialize_q_table(True), workers=1)
+    listener = await server.start(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=1 << 20)
+    replies = []
+    try:
+        for line in lines:
+            writer.write(line + b"\n")
+            await writer.drain()
+            replies.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+    finally:
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+    return replies
+
+def run(*requests):
+    return asyncio.run(exchange([request if isinstance(request, bytes)
+                                 else json.dumps(request).encode() for request in requests]))
+
+# Bad cells get an error reply, the game is unchanged, and the connection
+# keeps answering
+def test_bad_cells_get_error_replies():
+    bad_cells = [b'{"op": "move", "session": 1, "cell": 1e999}', {"op": "move", "session": 1, "cell": 4.7},
+                 {"op": "move", "session": 1, "cell": 4.0}, {"op": "move", "session": 1, "cell": True},
+                 {"op": "move", "session": 1, "cell": "4"}, {"op": "move", "session": 1, "cell": None},
+                 {"op": "move", "session": 1, "cell": -1}, {"op": "move", "session": 1, "cell": 9},
+                 {"op": "move", "session": 1}]
+    replies = run({"op": "new", "agent": "perfect"}, *bad_cells, {"op": "move", "session": 1, "cell": 4})
+    assert replies[0]["ok"] and replies[0]["board"] == "." * 9
+    for reply in replies[1:-1]:
+        assert reply["ok"] is False and reply["error"]
+    assert replies[-1]["ok"] and replies[-1]["board"][4] == "X"
+
+def test_taken_cell_and_unknown_session():
+    replies = run({"op": "new"}, {"op": "move", "session": 1, "cell": 4},
+                  {"op": "move", "session": 1, "cell": 4}, {"op": "move", "session": 2, "cell": 0})
+    assert replies[1]["ok"]
+    assert not replies[2]["ok"] and not replies[3]["ok"]
+
+def test_malformed_requests_keep_the_connection():
+    replies = run(b"[1, 2]", b"3", b"{bad", b"x" * (2 * LINE_LIMIT), {"op": "nope"}, {"op": "stats"})
+    assert [reply["ok"] for reply in replies] == [False] * 5 + [True]
+    assert "longer than" in replies[3]["error"]
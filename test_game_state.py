@@ -0,0 +1,64 @@
+import pytest
+from board_core import X, O, ONGOING, X_WINS, O_WINS, TIE, WIN_LINES, masks_to_state
+from game_state import GameState
+
+# Every game from the empty board, made and taken back on one GameState:
+# the finished games split into the known numbers of wins and ties, and
+# the state number always matches the masks
+def test_walk_the_game_tree():
+    game = GameState()
+    finished = dict.fromkeys((X_WINS, O_WINS, TIE), 0)
+
+    def walk():
+        assert game.state == masks_to_state(game.x_mask, game.o_mask)
+        result = game.outcome()
+        if result != ONGOING:
+            finished[result] += 1
+            return
+        for cell in game.legal_moves():
+            game.push(cell)
+            walk()
+            assert game.pop() == cell
+
+    walk()
+    assert finished == {X_WINS: 131184, O_WINS: 77904, TIE: 46080}
+    assert (game.x_mask, game.o_mask, game.state, game.count, game.side) == (0, 0, 0, 0, X)
+
+def test_win_and_winning_line():
+    game = GameState.from_moves([4, 0, 3, 8], first=X)
+    assert game.outcome() == ONGOING and game.winner() is None and game.winning_line() == -1
+    game.push(5)  # X completes the middle row
+    assert game.to_string() == "O..XXX..O"
+    assert game.outcome() == X_WINS and game.is_over() and game.winner() == X
+    assert WIN_LINES[game.winning_line()] == (3, 4, 5)
+    assert game.next_first() == X
+    game.pop()
+    assert not game.is_over() and game.side == X
+
+def test_o_win_and_tie():
+    game = GameState.from_moves([0, 1, 3, 4, 8, 7], first=X)
+    assert game.winner() == O and WIN_LINES[game.winning_line()] == (1, 4, 7)
+    assert game.next_first() == O
+    tie = GameState.from_moves([0, 4, 8, 1, 7, 6, 2, 5, 3], first=X)
+    assert tie.outcome() == TIE and tie.winning_line() == -1
+    assert tie.next_first() == O  # X moved last
+    tie = GameState.from_moves([0, 4, 8, 1, 7, 6, 2, 5, 3], first=O)
+    assert tie.outcome() == TIE and tie.next_first() == X
+
+def test_copy_moves_and_strings():
+    game = GameState.from_moves([4, 0, 8], first=O)
+    assert game.to_string() == "X...O...O" and game.moves() == [4, 0, 8]
+    assert game.side == X and repr(game) == "GameState('X...O...O', side=X)"
+    copy = game.copy()
+    copy.push(1)
+    assert game.moves() == [4, 0, 8] and copy.moves() == [4, 0, 8, 1]
+    assert game.to_string() == "X...O...O"
+
+def test_illegal_moves():
+    game = GameState.from_moves([4])
+    for cell in (4, -1, 9):
+        with pytest.raises(ValueError):
+            game.push(cell)
+    game.pop()
+    with pytest.raises(IndexError):
+        game.pop()
@@ -0,0 +1,34 @@
+from board_core import X, O, X_WINS
+from mcts import MCTSSearch
+
+def masks(cells):
+    return sum(1 << cell for cell in cells)
+
+# X O .
+# X O .   X to move completes the left column
+# . . .
+def test_takes_the_immediate_win():
+    for seed in range(5):
+        assert MCTSSearch(time_budget=0.05, seed=seed).best_move(masks([0, 3]), masks([1, 4]), X) == 6
+
+# X X .
+# O . .   O has no line it can finish, so it must block the top row
+# O . X
+def test_blocks_the_immediate_loss():
+    for seed in range(5):
+        assert MCTSSearch(time_budget=0.05, seed=seed).best_move(masks([0, 1, 8]), masks([3, 6]), O) == 2
+
+# X X .
+# O O .   O to move wins in the middle row rather than blocking X
+# . . X
+def test_prefers_winning_to_blocking():
+    assert MCTSSearch(time_budget=0.05, seed=0).best_move(masks([0, 1, 8]), masks([3, 4]), O) == 5
+
+# A finished position scores the whole batch for the player who won there
+def test_terminal_node_scores():
+    engine = MCTSSearch(seed=0)
+    engine.best_move(masks([0, 3]), masks([1, 4]), X)
+    child = engine.root.children[6]
+    assert child.result == X_WINS
+    assert engine._simulate(child) == engine.batch
+    assert engine.best_move(masks([0, 3, 6]), masks([1, 4]), O) == -1
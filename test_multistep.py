@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from board_core import X, O, play
+from q_training import initialize_q_table
+from schedules import as_schedule
+from multistep import MAX_PLIES, _backup, train_multistep
+
+GAMMA = 0.9
+LAM = 0.5
+# X takes 0, 1, 2 and wins the top row; O takes 3 and 4 in between
+MOVES = (0, 3, 1, 4, 2)
+
+# Back up the one game above on an all-zero table with alpha = 1, so each
+# Q-value becomes its target. Returns the value of every move in the game.
+def backed_up(mode, exploratory_ply=None, n=3):
+    states = [0]
+    for ply, cell in enumerate(MOVES):
+        states.append(play(states[-1], cell, X if ply % 2 == 0 else O))
+    shape = (MAX_PLIES, 1)
+    rows, actions = np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=np.int64)
+    rewards, next_states = np.zeros(shape), np.zeros(shape, dtype=np.int64)
+    dones, valid = np.zeros(shape, dtype=bool), np.zeros(shape, dtype=bool)
+    greedy = np.ones(shape, dtype=bool)
+    for ply, cell in enumerate(MOVES):
+        rows[ply], actions[ply], next_states[ply] = states[ply], cell, states[ply + 1]
+        valid[ply] = True
+    rewards[len(MOVES) - 1] = dones[len(MOVES) - 1] = 1
+    if exploratory_ply is not None:
+        greedy[exploratory_ply] = False
+    q_table = initialize_q_table().astype(np.float64)
+    _backup(q_table, rows, actions, rewards, next_states, dones, valid, greedy,
+            mode, LAM, n, as_schedule(1.0), GAMMA, False, 0, None)
+    return [q_table[states[ply], cell] for ply, cell in enumerate(MOVES)]
+
+# Each move's value, first move first. Untouched table entries are 0, so a
+# max over the next position is 0 whenever the mover's value there is
+# negative.
+@pytest.mark.parametrize("mode, expected", [
+    # One step: only O's last move sees the win
+    ("q", [0, 0, 0, -GAMMA, 1]),
+    # Three alternating rewards, then the value three moves on; X's second
+    # move looks ahead to X's win
+    ("nstep", [0, -GAMMA ** 3, GAMMA ** 2, -GAMMA, 1]),
+    # The win reaches every move, shrinking by lambda * gamma per move
+    # wherever the one-step part is 0
+    ("lambda", [LAM ** 2 * GAMMA ** 4, -LAM * GAMMA ** 3, LAM * GAMMA ** 2, -GAMMA, 1]),
+])
+def test_returns_on_a_known_game(mode, expected):
+    assert backed_up(mode) == pytest.approx(expected)
+
+# With every move greedy Watkins's Q(lambda) is plain Q(lambda). After the
+# exploratory move at ply 3 it cuts the trace, so the win never reaches the
+# moves before it.
+def test_watkins_cuts_the_trace():
+    assert backed_up("watkins") == pytest.approx(backed_up("lambda"))
+    assert backed_up("watkins", exploratory_ply=3) == pytest.approx([0, 0, 0, -GAMMA, 1])
+
+def test_training_runs_every_mode():
+    for mode in ("q", "nstep", "lambda", "watkins"):
+        q_table, stats = train_multistep(num_episodes=300, num_boards=64, mode=mode, seed=0)
+        assert stats["episodes"] == 300
+        assert stats["x_wins"] + stats["o_wins"] + stats["ties"] == 300
+        assert np.isfinite(q_table).all() and q_table.any()
+    with pytest.raises(ValueError):
+        train_multistep(num_episodes=1, mode="sarsa")
@@ -0,0 +1,42 @@
+import io
+import time
+from board_core import X
+from profiling import Profiler, NULL_PHASE, profiler
+from search import MinimaxSearch
+
+def test_disabled_profiler_records_nothing():
+    off = Profiler(enabled=False)
+    assert off.phase("draw") is NULL_PHASE
+    off.count("frames")
+    assert off.summary()["counters"] == {} and off.summary()["phases"] == {}
+
+def test_phases_and_counters():
+    on = Profiler(enabled=True, trace=False)
+    for _ in range(3):
+        with on.phase("draw"):
+            pass
+    on.count("frames", 2)
+    summary = on.summary()
+    assert summary["phases"]["draw"]["calls"] == 3
+    assert summary["counters"] == {"frames": 2}
+
+# With nothing rendering, the timer thread still prints summaries
+def test_report_timer():
+    on = Profiler(enabled=True, trace=False)
+    on.count("frames")
+    out = io.StringIO()
+    on.start_report_timer(0.01, out)
+    time.sleep(0.2)
+    assert out.getvalue().count("profile after") >= 2
+    assert "frames" in out.getvalue()
+
+# A search counts the nodes it visited, none when the move is cached
+def test_search_nodes_are_counted(monkeypatch):
+    monkeypatch.setattr(profiler, "enabled", True)
+    profiler.reset()
+    engine = MinimaxSearch()
+    engine.best_move(0, 0, X)
+    assert profiler.counters["search_nodes"] == engine.nodes > 0
+    engine.best_move(0, 0, X)
+    assert profiler.counters["search_nodes"] == engine.nodes
+    profiler.reset()
@@ -0,0 +1,58 @@
+import numpy as np
+from q_storage import SparseQStore, DenseQStore, EVICT_FRACTION
+
+ROWS = EVICT_FRACTION  # Small enough that a full store evicts one row at a time
+
+def filled_store(eviction):
+    store = SparseQStore(max_rows=ROWS, eviction=eviction, slab_rows=4)
+    for key in range(ROWS):
+        store.update(key, 0, float(key + 1), 1.0)
+    return store
+
+def test_rows_are_allocated_on_first_update():
+    store = SparseQStore()
+    assert len(store) == 0 and 5 not in store
+    assert not store.row(5).any()
+    store.update(5, 2, 1.0, 0.5)
+    assert 5 in store and store.row(5)[2] == 0.5
+    assert store.stats()["misses"] == 2
+
+# The least recently used row goes first, whether it was read or written
+def test_lru_eviction():
+    store = filled_store("lru")
+    store.row(0)
+    store.update(ROWS, 0, 1.0, 1.0)
+    assert len(store) == ROWS and store.stats()["evictions"] == 1
+    assert 0 in store and ROWS in store and 1 not in store
+    assert not store.row(1).any()  # Evicted states read as zeros again
+
+# The least visited row goes first, even if it was used more recently than
+# a popular one; the oldest one breaks ties
+def test_lfu_eviction():
+    store = filled_store("lfu")
+    for _ in range(3):
+        store.row(0)
+    for key in range(1, ROWS):
+        store.row(key)
+    store.update(ROWS, 0, 1.0, 1.0)
+    assert 0 in store and 1 not in store and 2 in store
+
+# A reused slot starts from zeros, and the kept rows are untouched
+def test_evicted_slot_is_cleared():
+    store = filled_store("lru")
+    store.update(ROWS, 1, 2.0, 1.0)
+    assert store.row(ROWS).tolist() == [0.0, 2.0] + [0.0] * 7
+    for key in range(2, ROWS):
+        assert store.row(key)[0] == key + 1
+
+def test_dense_round_trip():
+    table = np.zeros((20, 9), dtype=np.float32)
+    table[[3, 7, 11], [0, 4, 8]] = [1.0, -0.5, 0.25]
+    store = SparseQStore.from_dense(table)
+    assert len(store) == 3
+    assert (store.to_dense(20) == table).all()
+    dense = DenseQStore(table.copy())
+    keys, actions = np.array([3, 7, 7]), np.array([0, 4, 4])
+    dense.scatter_add(keys, actions, np.array([1.0, 1.0, 1.0]))
+    store.scatter_add(keys, actions, np.array([1.0, 1.0, 1.0]))
+    assert (store.gather(keys, actions) == dense.gather(keys, actions)).all()
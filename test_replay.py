@@ -0,0 +1,50 @@
+import numpy as np
+from replay import ReplayBuffer, PRIORITY_OFFSET
+
+def fill(buffer, start, count):
+    states = np.arange(start, start + count)
+    buffer.add(states, states % 9, np.ones(count), states + 1, states % 2 == 0)
+
+# Writes past the end wrap round and overwrite the oldest transitions
+def test_wraparound():
+    buffer = ReplayBuffer(capacity=8)
+    fill(buffer, 0, 5)
+    assert len(buffer) == 5 and buffer.position == 5
+    fill(buffer, 5, 6)
+    assert len(buffer) == 8 and buffer.position == 3
+    assert buffer.states.tolist() == [8, 9, 10, 3, 4, 5, 6, 7]
+    assert (buffer.next_states == buffer.states + 1).all()
+    assert (buffer.actions == buffer.states % 9).all()
+
+# A batch bigger than the buffer keeps only its newest transitions
+def test_oversized_add():
+    buffer = ReplayBuffer(capacity=4)
+    fill(buffer, 0, 1)
+    fill(buffer, 100, 10)
+    assert len(buffer) == 4 and sorted(buffer.states.tolist()) == [106, 107, 108, 109]
+    buffer.add(7, 0, 0.0, 8, True)  # A single transition
+    assert 7 in buffer.states.tolist() and len(buffer) == 4
+
+def test_uniform_sampling():
+    buffer = ReplayBuffer(capacity=16)
+    fill(buffer, 0, 10)
+    indices, weights = buffer.sample(32, np.random.default_rng(0))
+    assert indices.shape == weights.shape == (32,)
+    assert indices.min() >= 0 and indices.max() < 10
+    assert (weights == 1).all()
+
+# Prioritized sampling favours large TD errors and down-weights them
+def test_prioritized_sampling():
+    buffer = ReplayBuffer(capacity=16)
+    fill(buffer, 0, 10)
+    td_errors = np.zeros(10)
+    td_errors[3] = 100.0
+    buffer.update_priorities(np.arange(10), td_errors)
+    assert buffer.priorities[0] == np.float32(PRIORITY_OFFSET)
+    assert buffer.max_priority == np.float32(100.0 + PRIORITY_OFFSET)
+    indices, weights = buffer.sample(1000, np.random.default_rng(0), prioritized=True)
+    assert indices.shape == weights.shape == (1000,) and weights.dtype == np.float32
+    assert indices.max() < 10 and (indices == 3).mean() > 0.9
+    assert weights.max() == 1 and (weights[indices == 3] < weights[indices != 3].min()).all()
+    fill(buffer, 10, 1)  # New transitions start at the highest priority
+    assert buffer.priorities[10] == buffer.max_priority
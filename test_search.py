@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from board_core import X, O, NUM_STATES, STATE_OUTCOMES, ONGOING, state_masks
+from transitions import TO_MOVE
+from solver import solve, REACHED_X_FIRST, REACHED_O_FIRST
+from search import MinimaxSearch, EXACT, LOWER, UPPER, INFINITY
+
+@pytest.fixture(scope="module")
+def values():
+    return solve()[0]
+
+# Every (state, side to move) pair that comes up in a real game
+def reachable_positions():
+    reachable = solve()[2]
+    positions = set()
+    for first, flag in ((X, REACHED_X_FIRST), (O, REACHED_O_FIRST)):
+        states = np.flatnonzero((reachable & flag != 0) & (STATE_OUTCOMES == ONGOING))
+        positions.update(zip(states.tolist(), TO_MOVE[first - 1, states].tolist()))
+    return sorted(positions)
+
+# Keeps nothing, so every position is searched from scratch
+class NoTable(dict):
+    def __setitem__(self, key, value):
+        pass
+
+# One engine scores every position, so later searches lean on entries left
+# by earlier ones
+def test_scores_match_the_solver(values):
+    engine = MinimaxSearch()
+    positions = reachable_positions()
+    assert len(positions) == 2 * 4520
+    for state, side in positions:
+        assert engine.score(*state_masks(state), side) == values[side - 1, state], (state, side)
+
+def test_window_sets_the_flag(values):
+    engine = MinimaxSearch()
+    key = engine._key(0, X)
+    assert values[0, 0] == 0
+    for alpha, beta, flag in ((5, 10, UPPER), (-10, -5, LOWER), (-INFINITY, INFINITY, EXACT)):
+        engine.table.clear()
+        value = engine._negamax(0, 0, 0, X, alpha, beta)
+        assert engine.table[key] == (flag, value)
+        assert value <= alpha if flag == UPPER else value >= beta if flag == LOWER else value == 0
+
+# Entries stored by narrow-window searches are bounds on the true score:
+# exact ones equal it, lower bounds are below it and upper bounds above
+def test_stored_bounds_hold(values):
+    engine = MinimaxSearch()
+    rng = np.random.default_rng(0)
+    for state, side in reachable_positions()[::7]:
+        x_mask, o_mask = state_masks(state)
+        me, them = (x_mask, o_mask) if side == X else (o_mask, x_mask)
+        alpha = int(rng.integers(-20, 20))
+        engine._negamax(me, them, state, side, alpha, alpha + int(rng.integers(1, 6)))
+    flags = set()
+    for key, (flag, value) in engine.table.items():
+        side, state = (X, key) if key < NUM_STATES else (O, key - NUM_STATES)
+        true = values[side - 1, state]
+        flags.add(flag)
+        assert value == true if flag == EXACT else value <= true if flag == LOWER else value >= true
+    assert flags == {EXACT, LOWER, UPPER}
+
+# Same answer for the opening move with and without the table, with far
+# fewer nodes searched when it is on
+def test_table_saves_nodes():
+    with_table, without_table = MinimaxSearch(), MinimaxSearch()
+    without_table.table = NoTable()
+    assert with_table.best_move(0, 0, X) == without_table.best_move(0, 0, X)
+    assert with_table.nodes * 5 < without_table.nodes
+    assert with_table.stats()["hits"] > 0 and without_table.stats()["hits"] == 0
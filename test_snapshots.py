@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from snapshots import save_q_table, load_q_table, read_header, train_with_checkpoints
+
+# Stopping after the first checkpoint and resuming gives the same table as
+# one uninterrupted run: the second chunk gets the same seed either way
+def test_resume_continues_the_seed_stream(tmp_path):
+    whole, _ = train_with_checkpoints(str(tmp_path / "whole.bin"), 400, checkpoint_every=200,
+                                      seed=3, canonical=True)
+    path = str(tmp_path / "resumed.bin")
+    first, _ = train_with_checkpoints(path, 200, checkpoint_every=200, seed=3, canonical=True)
+    assert read_header(path)[0]["seed_chunks"] == 1
+    resumed, episodes = train_with_checkpoints(path, 400, checkpoint_every=200, seed=3,
+                                               canonical=True)
+    assert episodes == 400 and read_header(path)[0]["seed_chunks"] == 2
+    assert not np.array_equal(first, whole)
+    assert np.array_equal(resumed, whole)
+    assert np.array_equal(load_q_table(path)[0], whole)
+
+# Snapshots without the seed count resume after the chunks their episode
+# count implies
+def test_resume_old_snapshot(tmp_path):
+    whole, _ = train_with_checkpoints(str(tmp_path / "whole.bin"), 400, checkpoint_every=200,
+                                      seed=3, canonical=True)
+    path = str(tmp_path / "old.bin")
+    first, _ = train_with_checkpoints(path, 200, checkpoint_every=200, seed=3, canonical=True)
+    save_q_table(path, first, episodes=200, canonical=True)
+    resumed, _ = train_with_checkpoints(path, 400, checkpoint_every=200, seed=3, canonical=True)
+    assert np.array_equal(resumed, whole)
+
+def test_resume_refuses_other_layout(tmp_path):
+    path = str(tmp_path / "q_table.bin")
+    train_with_checkpoints(path, 100, checkpoint_every=100, seed=0, canonical=True)
+    with pytest.raises(ValueError):
+        train_with_checkpoints(path, 200, checkpoint_every=100, seed=0, canonical=False)
+    assert read_header(path)[0]["episodes"] == 100
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from board_core import X, O, ONGOING, TIE, STATE_LEGAL_MASK, play, state_outcome
+from search import WIN_SCORE
+from solver import (FILE_SIZE, solve, save_tables, load_tables, load_or_solve, best_move,
+                    optimal_moves, position_value)
+
+# Every game where `player` follows best_move() and the other side tries
+# each legal reply; returns the set of results reached
+def results_against_everything(player, state=0, side=X):
+    result = state_outcome(state)
+    if result != ONGOING:
+        return {result}
+    if side == player:
+        cell = best_move(state, side)
+        assert STATE_LEGAL_MASK[state, cell]
+        return results_against_everything(player, play(state, cell, side), X + O - side)
+    results = set()
+    for cell in np.flatnonzero(STATE_LEGAL_MASK[state]).tolist():
+        results |= results_against_everything(player, play(state, cell, side), X + O - side)
+    return results
+
+# Whoever starts, the solved player never loses, and some careless
+# replies let it win
+@pytest.mark.parametrize("player, first", [(X, X), (X, O), (O, X), (O, O)])
+def test_best_move_never_loses(player, first):
+    results = results_against_everything(player, side=first)
+    assert results <= {player, TIE} and player in results
+
+def test_values():
+    assert position_value(0, X) == position_value(0, O) == 0
+    # X has 0 and 1, O has 3 and 4: whoever moves wins at once, with four
+    # cells left
+    state = 1 + 3 + 2 * 27 + 2 * 81
+    assert position_value(state, X) == position_value(state, O) == WIN_SCORE + 4
+    assert optimal_moves(state, X) == (2,) and optimal_moves(state, O) == (5,)
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "perfect_play.bin"
+    tables = solve()
+    save_tables(str(path), *tables)
+    assert path.stat().st_size == FILE_SIZE
+    assert list(tmp_path.iterdir()) == [path]  # No temporary file left
+    for loaded, expected in zip(load_tables(str(path)), tables):
+        assert loaded.shape == expected.shape and (loaded == expected).all()
+
+# Truncated or foreign files are refused by load_tables() and solved again
+# by load_or_solve()
+@pytest.mark.parametrize("damage", [lambda data: data[:-1], lambda data: data + b"\0",
+                                    lambda data: b"TTTN" + data[4:]])
+def test_bad_file_is_solved_again(tmp_path, damage):
+    path = tmp_path / "perfect_play.bin"
+    tables = solve()
+    save_tables(str(path), *tables)
+    path.write_bytes(damage(path.read_bytes()))
+    with pytest.raises(ValueError):
+        load_tables(str(path))
+    assert (load_or_solve(str(path))[1] == tables[1]).all()
+    assert path.stat().st_size == FILE_SIZE
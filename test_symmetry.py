@@ -0,0 +1,46 @@
+import numpy as np
+from board_core import NUM_STATES, STATE_CELLS, PLACE_VALUES, X, EMPTY
+from symmetry import (TRANSFORMS, CANONICAL_STATES, CANONICAL_TRANSFORMS, CANONICAL_ROWS,
+                      NUM_CANONICAL_STATES, canonicalize, canonical_row, to_canonical_action,
+                      from_canonical_action)
+
+POWERS = np.array(PLACE_VALUES)
+
+# State number of every board after moving cell c to cell transform[c]
+def transformed(transform):
+    image = np.empty_like(STATE_CELLS)
+    image[:, list(transform)] = STATE_CELLS
+    return image @ POWERS
+
+def test_transforms_are_the_eight_symmetries():
+    assert len(set(TRANSFORMS)) == 8
+    assert all(sorted(transform) == list(range(9)) for transform in TRANSFORMS)
+    assert TRANSFORMS[0] == tuple(range(9))
+
+# Applying a state's transform to its board gives the canonical state, and
+# that is the smallest of the 8 images
+def test_canonical_state_is_the_smallest_image():
+    images = np.stack([transformed(transform) for transform in TRANSFORMS])
+    assert (images.min(axis=0) == CANONICAL_STATES).all()
+    assert (images[CANONICAL_TRANSFORMS, np.arange(NUM_STATES)] == CANONICAL_STATES).all()
+
+def test_symmetric_boards_share_a_row():
+    for transform in TRANSFORMS:
+        assert (CANONICAL_ROWS[transformed(transform)] == CANONICAL_ROWS).all()
+    assert len(np.unique(CANONICAL_ROWS)) == NUM_CANONICAL_STATES == 2862
+
+def test_actions_round_trip():
+    for transform in range(len(TRANSFORMS)):
+        for cell in range(9):
+            assert from_canonical_action(to_canonical_action(cell, transform), transform) == cell
+
+# Playing a move and then canonicalizing lands on the same board as playing
+# the mapped move on the canonical board
+def test_moves_commute_with_canonicalization():
+    for state in range(0, NUM_STATES, 7):
+        canonical, transform = canonicalize(state)
+        for cell in np.flatnonzero(STATE_CELLS[state] == EMPTY).tolist():
+            moved = state + X * PLACE_VALUES[cell]
+            mapped = canonical + X * PLACE_VALUES[to_canonical_action(cell, transform)]
+            assert canonicalize(moved)[0] == canonicalize(mapped)[0]
+            assert canonical_row(moved)[0] == canonical_row(mapped)[0]
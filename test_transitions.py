@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from board_core import X, O, NUM_STATES, X_WINS, STATE_OUTCOMES
+from transitions import (NEXT_STATE, REWARD, TERMINAL, TO_MOVE, FILE_SIZE, build, save_tables,
+                         load_tables, check_consistency, step)
+
+def test_tables_match_the_board_scan():
+    checked, mismatches = check_consistency()
+    assert checked == 98604
+    assert mismatches == []
+
+# A wrong entry in any table is reported
+@pytest.mark.parametrize("table, index, value", [
+    (0, (X - 1, 0, 4), 5),        # next state
+    (1, (O - 1, 9, 0), 1),        # reward
+    (2, (1,), True),              # terminal
+    (3, (O - 1, 0), X),           # side to move
+])
+def test_consistency_check_catches_errors(table, index, value):
+    tables = [array.copy() for array in build()]
+    tables[table][index] = value
+    assert check_consistency(tuple(tables))[1]
+
+def test_step():
+    # X has 0 and 1, O has 3 and 4; X completes the top row
+    state = 1 + 3 + 2 * 27 + 2 * 81
+    next_states, rewards, done = step(np.array([state, state]), np.array([2, 5]), np.array([X, O]))
+    assert rewards.tolist() == [1, 1] and done.all()
+    assert TO_MOVE[X - 1, next_states].tolist() == [0, 0]
+    assert NEXT_STATE[X - 1, next_states[0]].tolist() == [-1] * 9
+    assert NEXT_STATE[X - 1, state, 0] == -1  # Taken cell
+    assert TO_MOVE[X - 1, state] == X
+    assert TO_MOVE[O - 1, 2] == X and TO_MOVE[O - 1, 1] == 0  # One O / one X after O started
+    assert not TERMINAL[state]
+    assert STATE_OUTCOMES[next_states[0]] == X_WINS
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "transitions.bin")
+    save_tables(path, *build())
+    assert (tmp_path / "transitions.bin").stat().st_size == FILE_SIZE
+    assert list(tmp_path.iterdir()) == [tmp_path / "transitions.bin"]  # No temporary file left
+    for loaded, expected in zip(load_tables(path), (NEXT_STATE, REWARD, TERMINAL, TO_MOVE)):
+        assert loaded.dtype == expected.dtype and (loaded == expected).all()
+    assert load_tables(path)[0].shape == (2, NUM_STATES, 9)
+
+# Truncated or foreign files are refused
+@pytest.mark.parametrize("damage", [lambda data: data[:-1], lambda data: data + b"\0",
+                                    lambda data: b"TTTG" + data[4:]])
+def test_bad_file_is_refused(tmp_path, damage):
+    path = tmp_path / "transitions.bin"
+    save_tables(str(path), *build())
+    path.write_bytes(damage(path.read_bytes()))
+    with pytest.raises(ValueError):
+        load_tables(str(path))
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from board_core import X, O, EMPTY, PLACE_VALUES, STATE_CELLS
+from transitions import step
+from vec_env import VecTicTacToeEnv
+
+# Random legal play on many boards gives the same states, rewards and dones
+# as transitions.step(), and the boards always match their state numbers
+def test_random_play_matches_transitions():
+    rng = np.random.default_rng(0)
+    env = VecTicTacToeEnv(64)
+    env.reset()
+    finished = 0
+    for _ in range(200):
+        mask = env.legal_mask()
+        assert mask.any(axis=1).all()  # Auto-reset leaves no finished board
+        actions = np.array([rng.choice(np.flatnonzero(row)) for row in mask])
+        states, players = env.states.copy(), env.players.copy()
+        expected_states, expected_rewards, expected_dones = step(states, actions, players)
+        boards, rewards, dones, info = env.step(actions)
+        assert (info["states"] == expected_states).all()
+        assert (rewards == expected_rewards).all() and (dones == expected_dones).all()
+        assert (info["players"] == players).all()
+        assert (boards @ np.array(PLACE_VALUES) == env.states).all()
+        if dones.any():
+            finished += int(dones.sum())
+            assert (info["final_boards"] == STATE_CELLS[expected_states[dones]]).all()
+            assert (boards[dones] == EMPTY).all() and (env.states[dones] == 0).all()
+    assert finished > 100
+
+# The winner starts the next game; after a tie the player who didn't make
+# the last move does
+def test_next_starting_player():
+    env = VecTicTacToeEnv(2)
+    env.reset()
+    for cell in (0, 3, 1, 4):
+        env.step([cell, cell])
+    _, rewards, dones, info = env.step([2, 2])
+    assert rewards.tolist() == [1, 1] and dones.all()
+    assert env.players.tolist() == [X, X]
+
+    env = VecTicTacToeEnv(1)
+    env.reset()
+    for cell in (0, 4, 8, 1, 7, 6, 2, 5):
+        env.step([cell])
+    _, rewards, dones, _ = env.step([3])
+    assert rewards.tolist() == [0] and dones.all()
+    assert env.players.tolist() == [O]
+
+def test_without_auto_reset():
+    env = VecTicTacToeEnv(1, auto_reset=False)
+    env.reset()
+    for cell in (0, 3, 1, 4):
+        env.step([cell])
+    boards, _, dones, info = env.step([2])
+    assert dones.all() and "final_boards" not in info
+    assert boards[0].tolist() == [X, X, X, O, O, 0, 0, 0, 0]
+    assert not env.legal_mask().any()
+
+def test_illegal_moves_and_indices():
+    env = VecTicTacToeEnv(3)
+    env.reset()
+    env.step([4], indices=[1])
+    assert env.states.tolist() == [0, X * PLACE_VALUES[4], 0]
+    assert env.legal_mask([1]).tolist() == [[True] * 4 + [False] + [True] * 4]
+    with pytest.raises(ValueError):
+        env.step([4], indices=[1])
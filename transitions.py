@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import numpy as np
+from board_core import (EMPTY, X, O, NUM_STATES, ONGOING, STATE_CELLS, STATE_OUTCOMES,
+                        PLACE_VALUES)
+
+# The whole game as lookup tables over the 3**9 state numbers, built with
+# NumPy when the module is imported, so environments, trainers and solvers
+# step a position by indexing instead of running any board logic:
+#   NEXT_STATE[side - 1, state, cell]  int16 state after `side` takes `cell`,
+#                                      -1 if the cell is taken or the game is over
+#   REWARD[side - 1, state, cell]      int8 reward for the mover: 1 if the
+#                                      move wins, 0 otherwise (tie, ongoing, illegal)
+#   TERMINAL[state]                    bool, somebody won or the board is full
+#   TO_MOVE[first - 1, state]          int8 side to move in a game `first`
+#                                      started, 0 once it is over or if the
+#                                      mark counts can't happen in such a game
+# The side to move is part of the index because the winner starts the next
+# game, so a state number alone doesn't say whose turn it is when both have
+# played equally often. Rewards from O's point of view, as in
+# q_training.train_headless, are REWARD for O's moves and -REWARD for X's.
+TRANSITIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "transitions.bin")
+MAGIC = b"TTTN"
+
+_CELL_VALUES = np.array(PLACE_VALUES, dtype=np.int64)
+# Tag, next states (int16), rewards, terminal flags, side to move
+FILE_SIZE = len(MAGIC) + 2 * NUM_STATES * 9 * 2 + 2 * NUM_STATES * 9 + NUM_STATES + 2 * NUM_STATES
+
+def build():
+    terminal = STATE_OUTCOMES != ONGOING
+    legal = (STATE_CELLS == EMPTY) & ~terminal[:, None]
+    states = np.arange(NUM_STATES, dtype=np.int64)[:, None]
+    next_state = np.full((2, NUM_STATES, 9), -1, dtype=np.int16)
+    reward = np.zeros((2, NUM_STATES, 9), dtype=np.int8)
+    for side in (X, O):
+        children = np.where(legal, states + side * _CELL_VALUES, 0)
+        next_state[side - 1] = np.where(legal, children, -1)
+        reward[side - 1] = legal & (STATE_OUTCOMES[children] == side)
+
+    x_count = (STATE_CELLS == X).sum(axis=1)
+    o_count = (STATE_CELLS == O).sum(axis=1)
+    to_move = np.zeros((2, NUM_STATES), dtype=np.int8)
+    for first in (X, O):
+        other = X + O - first
+        first_count, other_count = (x_count, o_count) if first == X else (o_count, x_count)
+        to_move[first - 1] = np.where(first_count == other_count, first,
+                                      np.where(first_count == other_count + 1, other, 0))
+        to_move[first - 1, terminal] = 0
+    return next_state, reward, terminal, to_move
+
+# Written to a temporary file first and then renamed, as in snapshots.py,
+# so a reader never sees a half-written file. The temporary name is per
+# process, so two runs saving at once don't write into the same file.
+def save_tables(path, next_state, reward, terminal, to_move):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(next_state.astype("<i2").tobytes())
+        f.write(reward.tobytes())
+        f.write(terminal.astype(np.uint8).tobytes())
+        f.write(to_move.tobytes())
+    os.replace(tmp_path, path)
+
+def load_tables(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a transition table")
+    if len(data) != FILE_SIZE:
+        raise ValueError(f"{path} is {len(data)} bytes, expected {FILE_SIZE}")
+    offset = len(MAGIC)
+    arrays = []
+    for dtype, count in (("<i2", 2 * NUM_STATES * 9), (np.int8, 2 * NUM_STATES * 9),
+                         (np.uint8, NUM_STATES), (np.int8, 2 * NUM_STATES)):
+        arrays.append(np.frombuffer(data, dtype=dtype, count=count, offset=offset))
+        offset += arrays[-1].nbytes
+    next_state, reward, terminal, to_move = arrays
+    return (next_state.reshape(2, NUM_STATES, 9), reward.reshape(2, NUM_STATES, 9),
+            terminal.astype(bool), to_move.reshape(2, NUM_STATES))
+
+# Building takes a few milliseconds, so importing never touches the disk;
+# only running this module writes the tables out (see __main__)
+NEXT_STATE, REWARD, TERMINAL, TO_MOVE = build()
+
+# Step arrays of states: sides[i] takes actions[i] in states[i]. Returns the
+# next states (-1 for an illegal move), the mover's rewards and whether each
+# game is over.
+def step(states, actions, sides):
+    next_states = NEXT_STATE[sides - 1, states, actions]
+    return next_states, REWARD[sides - 1, states, actions], TERMINAL[next_states]
+
+# The rules as Q_learninginRL.py's check_winner() and check_tie() scanned
+# them on the 3x3 board of symbols: rows, columns, then the diagonals
+def _scan_winner(board):
+    for row in range(3):
+        if board[row][0] == board[row][1] == board[row][2] != " ":
+            return board[row][0]
+    for col in range(3):
+        if board[0][col] == board[1][col] == board[2][col] != " ":
+            return board[0][col]
+    if board[0][0] == board[1][1] == board[2][2] != " ":
+        return board[0][0]
+    if board[0][2] == board[1][1] == board[2][0] != " ":
+        return board[0][2]
+    return None
+
+def _scan_tie(board):
+    return all(cell != " " for row in board for cell in row)
+
+# Walk every position reachable from the empty board, for either starting
+# player, on a plain list-of-lists board and compare every table entry with
+# the board scan: the state number after each move, the reward, whether the
+# game is over and whose turn it is. Returns the number of entries checked
+# and a list of the mismatches (empty when the tables agree).
+def check_consistency(tables=None):
+    next_state, reward, terminal, to_move = tables or (NEXT_STATE, REWARD, TERMINAL, TO_MOVE)
+    symbols = {X: "X", O: "O"}
+    checked = 0
+    mismatches = []
+
+    def expect(name, key, got, want):
+        if got != want:
+            mismatches.append((name, key, got, want))
+
+    for first in (X, O):
+        board = [[" "] * 3 for _ in range(3)]
+        seen = set()
+
+        def walk(state, side):
+            nonlocal checked
+            if state in seen:
+                return
+            seen.add(state)
+            over = _scan_winner(board) is not None or _scan_tie(board)
+            expect("terminal", state, bool(terminal[state]), over)
+            expect("to_move", (first, state), int(to_move[first - 1, state]), 0 if over else side)
+            for cell in range(9):
+                row, col = divmod(cell, 3)
+                key = (side, state, cell)
+                checked += 1
+                if over or board[row][col] != " ":
+                    expect("next_state", key, int(next_state[side - 1, state, cell]), -1)
+                    continue
+                board[row][col] = symbols[side]
+                child = sum(PLACE_VALUES[i * 3 + j] * (X if board[i][j] == "X" else O)
+                            for i in range(3) for j in range(3) if board[i][j] != " ")
+                expect("next_state", key, int(next_state[side - 1, state, cell]), child)
+                expect("reward", key, int(reward[side - 1, state, cell]),
+                       int(_scan_winner(board) == symbols[side]))
+                walk(child, X + O - side)
+                board[row][col] = " "
+
+        walk(0, first)
+    return checked, mismatches
+
+# Build the tables, save them to disk and check them against the board scan
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else TRANSITIONS_FILE
+    start = time.perf_counter()
+    tables = build()
+    built = time.perf_counter() - start
+    save_tables(path, *tables)
+    start = time.perf_counter()
+    load_tables(path)
+    loaded = time.perf_counter() - start
+    size = os.path.getsize(path)
+    print(f"Built the transition tables in {built * 1000:.1f} ms, saved {size / 1024:.0f} KiB "
+          f"to {path}, loaded back in {loaded * 1000:.1f} ms")
+    checked, mismatches = check_consistency(tables)
+    print(f"Checked {checked:,} transitions against the board scan: {len(mismatches)} mismatches")
+    for name, key, got, want in mismatches[:10]:
+        print(f"  {name} {key}: table {got}, board scan {want}")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,213 @@
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from board_core import X, O, NUM_STATES, STATE_CELLS, STATE_LEGAL_MASK, EMPTY
+from q_training import GAMMA, IDENTITY, initialize_q_table
+from transitions import NEXT_STATE, REWARD, TERMINAL, TO_MOVE
+from vec_env import VecTicTacToeEnv
+from multistep import OPPONENTS, train_multistep, play_greedy
+import solver
+
+SWEEP_MODES = ("sync", "async")
+TOLERANCE = 1e-9  # Largest Q-value change that counts as converged
+MAX_SWEEPS = 100
+EPISODIC_MODES = ("q", "watkins")
+EVAL_EVERY = 5000  # Episodes between evaluations of the episodic trainers
+MAX_EPISODES = 500000
+EVAL_GAMES = 2000
+SCORE_TOLERANCE = 0.01  # How close to the swept policy's score counts as "the same quality"
+
+# Q-iteration against a fixed opponent model instead of sampled episodes.
+# The agent plays whichever side is to move in every position reachable
+# with X moving first (as in play_greedy), and after each of its moves the
+# opponent answers from a known distribution: "random" picks any legal cell
+# (TicTacToe.py's AI), "minimax" any optimal cell (mini.py, from the solved
+# table in solver.py). One backup of every state-action pair is
+#   Q(s, a) = 1                                   if a wins
+#           = 0                                   if a fills the board
+#           = sum over replies b of p(b) * (-1 if b wins, 0 if it fills the
+#             board, else gamma * max Q(s'', a'))  otherwise
+# so values are for the player to move, like the ones multistep.py learns,
+# and the tables work with greedy_actions() and play_greedy().
+#
+# The model is built once as arrays over (state, action, reply) with the
+# transition tables from transitions.py, so every backup is a handful of
+# NumPy operations over the whole reachable state set.
+class OpponentModel:
+    def __init__(self, opponent="random", gamma=GAMMA):
+        if opponent not in OPPONENTS:
+            raise ValueError(f"Unknown opponent {opponent!r}, expected one of {OPPONENTS}")
+        self.opponent = opponent
+        reachable = (solver.find_reachable() & solver.REACHED_X_FIRST) != 0
+        states = np.flatnonzero(reachable & ~TERMINAL)
+        sides = TO_MOVE[X - 1, states].astype(np.int64)
+        others = X + O - sides
+
+        # The agent's move: a win or a full board ends the game at once
+        after = NEXT_STATE[sides[:, None] - 1, states[:, None], IDENTITY].astype(np.int64)
+        legal = after >= 0
+        won = REWARD[sides[:, None] - 1, states[:, None], IDENTITY] == 1
+        answered = legal & ~TERMINAL[np.where(legal, after, 0)]
+
+        # The opponent's replies and their probabilities
+        replied = np.where(answered, after, 0)
+        if opponent == "minimax":
+            optimal = solver.load_or_solve()[1]
+            allowed = (optimal[others[:, None] - 1, replied][..., None] >> IDENTITY & 1).astype(bool)
+        else:
+            allowed = STATE_LEGAL_MASK[replied]
+        allowed &= answered[..., None]
+        probability = allowed / np.maximum(allowed.sum(axis=2, keepdims=True), 1)
+        following = NEXT_STATE[others[:, None, None] - 1, replied[..., None], IDENTITY].astype(np.int64)
+        following = np.where(allowed, following, 0)
+        lost = allowed & (REWARD[others[:, None, None] - 1, replied[..., None], IDENTITY] == 1)
+        going_on = allowed & ~TERMINAL[following]
+
+        self.states = states
+        self.legal = legal
+        self.immediate = won - (probability * lost).sum(axis=2)
+        self.weights = gamma * probability * going_on
+        self.following = following
+        # Layers by marks on the board, fullest first: the positions a
+        # backup reads have two more marks than the one it updates
+        marks = (STATE_CELLS[states] != EMPTY).sum(axis=1)
+        self.layers = [np.flatnonzero(marks == count) for count in range(8, -1, -1)
+                       if (marks == count).any()]
+
+    # Backed-up Q-values of the model's states (or the rows in `rows`) given
+    # the state values `values` (max Q of every state number)
+    def backup(self, values, rows=slice(None)):
+        return self.immediate[rows] + (self.weights[rows] * values[self.following[rows]]).sum(axis=2)
+
+# max Q over the legal moves of every state number, 0 where the game is over
+def state_values(q_table, states=None):
+    legal = STATE_LEGAL_MASK if states is None else STATE_LEGAL_MASK[states]
+    q_values = q_table if states is None else q_table[states]
+    values = np.where(legal, q_values, -np.inf).max(axis=1)
+    return np.where(legal.any(axis=1), values, 0.0)
+
+# Sweep the model until no Q-value changes by more than `tol`. "sync"
+# backs up every state from the previous sweep's values (Jacobi); "async"
+# updates in place, layer by layer from the fullest boards back to the
+# empty one, so each layer already sees this sweep's values (Gauss-Seidel).
+# Returns the Q-table (one row per state number, float32 like the other
+# trainers) and a report with the residual of every sweep.
+def value_iteration(opponent="random", mode="sync", gamma=GAMMA, tol=TOLERANCE,
+                    max_sweeps=MAX_SWEEPS, model=None):
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {SWEEP_MODES}")
+    start = time.perf_counter()
+    if model is None:
+        model = OpponentModel(opponent, gamma)
+    built = time.perf_counter()
+    q_values = np.zeros((NUM_STATES, 9))
+    values = np.zeros(NUM_STATES)
+    states = model.states
+    residuals = []
+
+    while len(residuals) < max_sweeps:
+        if mode == "sync":
+            new = np.where(model.legal, model.backup(values), 0.0)
+            residual = float(np.abs(new - q_values[states]).max())
+            q_values[states] = new
+            values = state_values(q_values)
+        else:
+            residual = 0.0
+            for rows in model.layers:
+                layer = states[rows]
+                new = np.where(model.legal[rows], model.backup(values, rows), 0.0)
+                residual = max(residual, float(np.abs(new - q_values[layer]).max()))
+                q_values[layer] = new
+                values[layer] = state_values(q_values, layer)
+        residuals.append(residual)
+        if residual <= tol:
+            break
+
+    q_table = initialize_q_table(False)
+    q_table[:] = q_values
+    done = time.perf_counter()
+    return q_table, {"opponent": model.opponent, "mode": mode, "states": len(states),
+                     "sweeps": len(residuals), "residuals": residuals,
+                     "converged": residuals[-1] <= tol,
+                     "build_seconds": built - start, "sweep_seconds": done - built,
+                     "seconds": done - start}
+
+# Greedy play against the opponent; a draw counts as half a win, as in
+# early_stopping.py, so the best score is 1.0 against random and 0.5
+# against minimax
+def policy_score(q_table, opponent, games=EVAL_GAMES, seed=0):
+    results = play_greedy(q_table, False, opponent, games, seed)
+    return (results["wins"] + 0.5 * results["draws"]) / games
+
+# Episodes and training time (evaluations not included) the episodic
+# trainer in multistep.py needs before its greedy policy scores at least
+# `target` against the opponent; "episodes" is None if it never does
+# within max_episodes
+def episodic_time_to(target, opponent, mode="q", eval_every=EVAL_EVERY,
+                     max_episodes=MAX_EPISODES, games=EVAL_GAMES, seed=0):
+    q_table = initialize_q_table(False)
+    rng = np.random.default_rng(seed)
+    env = VecTicTacToeEnv(1024, auto_reset=False)
+    trained = 0
+    seconds = 0.0
+    score = policy_score(q_table, opponent, games, seed)
+    while score < target and trained < max_episodes:
+        start = time.perf_counter()
+        train_multistep(q_table, eval_every, mode, env=env, rng=rng, first_episode=trained)
+        seconds += time.perf_counter() - start
+        trained += eval_every
+        score = policy_score(q_table, opponent, games, seed)
+    return {"mode": mode, "episodes": trained if score >= target else None,
+            "seconds": seconds, "score": score}
+
+# Both sweep modes, the score of their policy, and what episodic training
+# takes to match it
+def compare(opponent="random", episodic_modes=EPISODIC_MODES, eval_every=EVAL_EVERY,
+            max_episodes=MAX_EPISODES, games=EVAL_GAMES, seed=0, tol=SCORE_TOLERANCE):
+    model_start = time.perf_counter()
+    model = OpponentModel(opponent)
+    model_seconds = time.perf_counter() - model_start
+    sweeps = {}
+    for mode in SWEEP_MODES:
+        q_table, report = value_iteration(opponent, mode, model=model)
+        report["build_seconds"] = model_seconds
+        report["seconds"] += model_seconds
+        report["score"] = policy_score(q_table, opponent, games, seed)
+        sweeps[mode] = report
+    target = sweeps["sync"]["score"] - tol
+    episodic = {mode: episodic_time_to(target, opponent, mode, eval_every, max_episodes, games, seed)
+                for mode in episodic_modes}
+    return {"opponent": opponent, "target": target, "sweeps": sweeps, "episodic": episodic}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Q-iteration against a fixed opponent, "
+                                                 "compared with episodic training")
+    parser.add_argument("--opponent", default="random", choices=OPPONENTS)
+    parser.add_argument("--episodic", nargs="*", default=list(EPISODIC_MODES),
+                        help="multistep.py modes to compare with (none to skip)")
+    parser.add_argument("--eval-every", type=int, default=EVAL_EVERY)
+    parser.add_argument("--max-episodes", type=int, default=MAX_EPISODES)
+    parser.add_argument("--games", type=int, default=EVAL_GAMES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = compare(args.opponent, args.episodic, args.eval_every, args.max_episodes,
+                     args.games, args.seed)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.exit()
+    for mode, sweep in report["sweeps"].items():
+        print(f"{mode:>5}: {sweep['sweeps']} sweeps over {sweep['states']} states in "
+              f"{sweep['seconds'] * 1000:.1f} ms (model {sweep['build_seconds'] * 1000:.1f} ms), "
+              f"score {sweep['score']:.3f} against {args.opponent}")
+        print("       residuals " + " ".join(f"{residual:.2g}" for residual in sweep["residuals"]))
+    print(f"Episodic training to a score of {report['target']:.3f}:")
+    for mode, run in report["episodic"].items():
+        if run["episodes"] is None:
+            print(f"  {mode:>8}: not within {args.max_episodes} episodes "
+                  f"({run['seconds']:.1f}s of training, score {run['score']:.3f})")
+        else:
+            print(f"  {mode:>8}: {run['episodes']} episodes, {run['seconds']:.2f}s of training")
@@ -0,0 +1,68 @@
+import numpy as np
+from board_core import EMPTY, X, O, STATE_OUTCOMES, STATE_LEGAL_MASK
+from transitions import NEXT_STATE, REWARD, TERMINAL
+
+# Many independent tic-tac-toe games stepped together, gym style. Board b is
+# row b of `boards`, a (B, 9) int8 array with 0 = empty, 1 = X, 2 = O (the
+# encoding of state_to_number); `states` keeps every board's state number
+# up to date, and a step is three lookups in the precomputed transition
+# tables (transitions.py): next state, reward and whether the game is over.
+#
+# step() takes one cell per board for the player to move and returns
+# (boards, rewards, dones, info). The reward is for the player who just
+# moved: 1 for a win, 0 otherwise. As in the games, the winner starts the
+# next game, otherwise the other player does. With auto_reset, finished
+# boards are cleared straight away and their last position is returned in
+# info["final_boards"].
+class VecTicTacToeEnv:
+    def __init__(self, num_boards, auto_reset=True):
+        self.num_boards = num_boards
+        self.auto_reset = auto_reset
+        self.boards = np.zeros((num_boards, 9), dtype=np.int8)
+        self.states = np.zeros(num_boards, dtype=np.int64)
+        self.players = np.full(num_boards, X, dtype=np.int8)  # Player to move
+
+    # Clear all boards (X moves first) or just the given ones (their starting
+    # player is the one set by the game that just ended)
+    def reset(self, indices=None):
+        if indices is None:
+            self.boards[:] = EMPTY
+            self.states[:] = 0
+            self.players[:] = X
+            return self.boards
+        self.boards[indices] = EMPTY
+        self.states[indices] = 0
+        return self.boards[indices]
+
+    # True for every move step() accepts, shape (B, 9) (or one row per
+    # index): the empty cells, none once a board's game is over
+    def legal_mask(self, indices=None):
+        states = self.states if indices is None else self.states[indices]
+        return STATE_LEGAL_MASK[states]
+
+    # Play actions[i] on board indices[i] (on every board if indices is None)
+    def step(self, actions, indices=None):
+        idx = np.arange(self.num_boards) if indices is None else np.asarray(indices)
+        actions = np.asarray(actions)
+        current = self.players[idx]
+        old_states = self.states[idx]
+        new_states = NEXT_STATE[current - 1, old_states, actions].astype(np.int64)
+        if (new_states < 0).any():
+            raise ValueError("Illegal move: cell is already taken or the game is over")
+
+        self.boards[idx, actions] = current
+        self.states[idx] = new_states
+        # Only the player who just moved can have completed a line
+        won = REWARD[current - 1, old_states, actions] == 1
+        dones = TERMINAL[new_states]
+        rewards = won.astype(np.float32)
+        outcomes = STATE_OUTCOMES[new_states]
+        self.players[idx] = np.where(won, current, X + O - current)
+
+        info = {"players": current, "states": new_states, "outcomes": outcomes}
+        if self.auto_reset and dones.any():
+            finished = idx[dones]
+            info["final_boards"] = self.boards[finished]
+            self.reset(finished)
+        boards = self.boards if indices is None else self.boards[idx]
+        return boards, rewards, dones, info